@@ -1,27 +1,51 @@
 import spacy
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from spacy.attrs import LOWER, IS_ALPHA
+from spacy.strings import get_string_id
 import re
 import yaml
 import os
-from fuzzywuzzy import fuzz
+import sys
+from rapidfuzz import fuzz, process
 from sklearn.metrics.pairwise import cosine_similarity
 import streamlit as st
 import numpy as np
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Sequence
 import hashlib
-from customer_sentiment import identify_agent_segments
+import base64
+import threading
+from functools import lru_cache, partial
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from customer_sentiment import identify_agent_segments, get_analyzer
 try:
-    from cryptography.fernet import Fernet
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
     CRYPTOGRAPHY_AVAILABLE = True
 except ImportError:
     CRYPTOGRAPHY_AVAILABLE = False
     Fernet = None
     print("Warning: cryptography module not available. Security features disabled.")
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
 
 # Global variables
 _spacy_nlp = None
 _config = None
 _cipher_suite = None
+_phrase_automata = {}
+_keyword_patterns = None
+_pii_patterns = None
+_scoring_settings = None
+_lowercase_phrase_tables = {}
+_spacy_lock = threading.Lock()
+_spacy_preload_thread = None
+_fuzzy_workers = -1
 
 @st.cache_resource
 def load_config():
@@ -40,16 +64,168 @@ def load_config():
             _config = {}
     return _config
 
+def get_config() -> Dict[str, Any]:
+    """
+    The loaded config for use inside this module: once it is in memory the
+    module-level copy is returned directly, skipping Streamlit's cache lookup.
+    """
+    return _config if _config is not None else load_config()
+
+@dataclass(frozen=True)
+class ScoringSettings:
+    """Scalar scoring options from the config, read once instead of per call"""
+    fuzzy_threshold: float
+    semantic_threshold: float
+    keyword_confidence_threshold: float
+    min_frequency_for_full_score: int
+    min_frequency_for_partial_score: int
+    nlp_frequency_weight: float
+    nlp_semantic_weight: float
+    nlp_distribution_weight: float
+    exact_only_categories: frozenset
+
+def get_scoring_settings() -> ScoringSettings:
+    """Frozen view of the scoring options, built on first use"""
+    global _scoring_settings
+    if _scoring_settings is None:
+        config = get_config()
+        scoring = config.get('scoring', {})
+        _scoring_settings = ScoringSettings(
+            fuzzy_threshold=scoring.get('fuzzy_threshold', 80),
+            semantic_threshold=scoring.get('semantic_threshold', 0.7),
+            keyword_confidence_threshold=scoring.get('keyword_confidence_threshold', 0.6),
+            min_frequency_for_full_score=scoring.get('min_frequency_for_full_score', 2),
+            min_frequency_for_partial_score=scoring.get('min_frequency_for_partial_score', 1),
+            nlp_frequency_weight=scoring.get('nlp_frequency_weight', 0.4),
+            nlp_semantic_weight=scoring.get('nlp_semantic_weight', 0.35),
+            nlp_distribution_weight=scoring.get('nlp_distribution_weight', 0.25),
+            exact_only_categories=frozenset(scoring.get('exact_only_categories', []) or [])
+        )
+    return _scoring_settings
+
+def set_fuzzy_workers(workers: int):
+    """
+    Threads per rapidfuzz cdist batch (-1 = one per core). Callers that already
+    run several analyses in parallel should pass 1 to avoid oversubscribing the CPU.
+    """
+    global _fuzzy_workers
+    _fuzzy_workers = workers
+
+def _load_spacy_pipeline():
+    """Load the spaCy pipeline once per process; safe to call from several threads"""
+    global _spacy_nlp
+    with _spacy_lock:
+        if _spacy_nlp is None:
+            model_name = os.getenv("SPACY_MODEL", "en_core_web_sm")
+            try:
+                nlp = spacy.load(model_name, exclude=list(EXCLUDED_COMPONENTS))
+            except Exception as e:
+                raise Exception(f"Failed to load SpaCy model: {e}. Try: python -m spacy download {model_name}")
+            # Warm the pipeline so lazily initialised weights are ready before the first real call
+            nlp("warmup")
+            _spacy_nlp = nlp
+    return _spacy_nlp
+
 @st.cache_resource
 def load_spacy_model():
-    """Load spaCy model with caching"""
-    global _spacy_nlp
-    if _spacy_nlp is None:
+    """Load spaCy model with caching (model name from SPACY_MODEL, default en_core_web_sm)"""
+    return _load_spacy_pipeline()
+
+def preload_spacy_model():
+    """
+    Start loading the spaCy model in a background thread so it is ready by the
+    time the first transcript is scored. Does nothing if it is already loaded
+    or loading. Load errors are reported again on first real use.
+    """
+    global _spacy_preload_thread
+    if _spacy_nlp is not None or (_spacy_preload_thread is not None and _spacy_preload_thread.is_alive()):
+        return
+    
+    def warm():
         try:
-            _spacy_nlp = spacy.load("en_core_web_sm")
+            _load_spacy_pipeline()
         except Exception as e:
-            raise Exception(f"Failed to load SpaCy model: {e}. Try: python -m spacy download en_core_web_sm")
-    return _spacy_nlp
+            print(f"Warning: Background spaCy load failed: {e}")
+    
+    _spacy_preload_thread = threading.Thread(target=warm, name="spacy-preload", daemon=True)
+    _spacy_preload_thread.start()
+
+def get_lowercase_phrases(section: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    Lowercased copy of a phrase table from the config (e.g. 'agent_behaviour_phrases',
+    'nlp_concepts', 'keywords'), built once so scoring loops never call str.lower() per phrase.
+    Phrases are interned, so a phrase shared between tables is one string object
+    and position lookups keyed by it hit the identity fast path.
+    """
+    if section not in _lowercase_phrase_tables:
+        config = get_config()
+        _lowercase_phrase_tables[section] = {
+            category: tuple(sys.intern(phrase.lower()) for phrase in phrases)
+            for category, phrases in config.get(section, {}).items()
+        }
+    return _lowercase_phrase_tables[section]
+
+@lru_cache(maxsize=None)
+def get_flat_phrases(*sections: str) -> Tuple[str, ...]:
+    """
+    Every distinct non-empty lowercased phrase of one or more config phrase
+    tables, flattened once in table order for the single-pass matchers.
+    """
+    return tuple(
+        phrase_lower
+        for phrase_lower in dict.fromkeys(
+            phrase_lower
+            for section in sections
+            for phrases_lower in get_lowercase_phrases(section).values()
+            for phrase_lower in phrases_lower
+        )
+        if phrase_lower
+    )
+
+# Components never run by any analysis are not loaded at all: en_core_web_sm
+# ships senter disabled because the parser already sets sentence boundaries
+EXCLUDED_COMPONENTS = ("senter",)
+
+# spaCy components each analysis reads from; everything else in the
+# en_core_web_sm pipeline is disabled for that call
+ENTITY_COMPONENTS = ("ner",)  # ner carries its own internal tok2vec
+SIMILARITY_COMPONENTS = ("tok2vec",)  # sets doc.tensor used for similarity
+
+def get_unused_components(nlp, needed_components) -> List[str]:
+    """Return the pipeline components that can be skipped for an analysis"""
+    return [name for name in nlp.pipe_names if name not in needed_components]
+
+class FileCipher:
+    """
+    AES-256-GCM file encryption (hardware-accelerated through OpenSSL).
+    Tokens are a random 96-bit nonce followed by the ciphertext and tag.
+    The GCM key is derived from the stored Fernet-format key, so existing key
+    files keep working, and files written by the old Fernet cipher still decrypt.
+    """
+    NONCE_SIZE = 12
+    LEGACY_TOKEN_PREFIX = b"gAAAAA"  # base64 of Fernet's 0x80 version byte
+
+    def __init__(self, key: bytes):
+        self._legacy_cipher = Fernet(key)
+        aead_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"call-analysis-file-encryption"
+        ).derive(base64.urlsafe_b64decode(key))
+        self._aead = AESGCM(aead_key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(self.NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, data, None)
+
+    def decrypt(self, token: bytes) -> bytes:
+        if token.startswith(self.LEGACY_TOKEN_PREFIX):
+            try:
+                return self._legacy_cipher.decrypt(token)
+            except InvalidToken:
+                pass
+        return self._aead.decrypt(token[:self.NONCE_SIZE], token[self.NONCE_SIZE:], None)
 
 def init_encryption():
     """Initialize encryption for secure file handling"""
@@ -59,7 +235,7 @@ def init_encryption():
         return None
         
     if _cipher_suite is None:
-        config = load_config()
+        config = get_config()
         key_file = config.get('security', {}).get('encryption_key_file', 'encryption.key')
         
         try:
@@ -73,14 +249,35 @@ def init_encryption():
                 with open(key_file, 'rb') as f:
                     key = f.read()
             
-            _cipher_suite = Fernet(key)
+            _cipher_suite = FileCipher(key)
         except Exception as e:
             print(f"Warning: Could not initialize encryption: {e}")
             return None
     return _cipher_suite
 
-# Sentiment setup
-analyzer = SentimentIntensityAnalyzer()
+# Sentiment setup: get_analyzer() returns the VADER instance shared with
+# customer_sentiment, so the lexicon is parsed at most once per process
+# Based on analysis: Net sentiment ranges from 0.03 to 0.28
+# Median is around 0.15
+# Use percentile-based classification:
+POSITIVE_NET_SENTIMENT = 0.17  # Top 33% - most positive
+NEGATIVE_NET_SENTIMENT = 0.12  # Bottom 33% - least positive (classified as negative)
+
+# Sentence-length texts recur (short replies, insight breakdowns) and are
+# worth memoising; whole transcripts are not kept in a process-wide cache
+MAX_CACHED_SENTIMENT_CHARS = 500
+
+def _net_sentiment(text: str) -> float:
+    scores = get_analyzer().polarity_scores(text)
+    return scores["pos"] - scores["neg"]
+
+_cached_net_sentiment = lru_cache(maxsize=8192)(_net_sentiment)
+
+def get_net_sentiment(text: str) -> float:
+    """VADER positive minus negative proportion for a text (memoised for sentence-length texts)"""
+    if len(text) > MAX_CACHED_SENTIMENT_CHARS:
+        return _net_sentiment(text)
+    return _cached_net_sentiment(text)
 
 def get_sentiment(text: str) -> str:
     """
@@ -88,22 +285,23 @@ def get_sentiment(text: str) -> str:
     Since all calls are net-positive due to agent language,
     we classify based on relative positivity instead. 
     """
-    scores = analyzer.polarity_scores(text)
-    pos_score = scores["pos"]
-    neg_score = scores["neg"]
-    net_sentiment = pos_score - neg_score
+    net_sentiment = get_net_sentiment(text)
     
-    # Based on analysis: Net sentiment ranges from 0.03 to 0.28
-    # Median is around 0.15
-    # Use percentile-based classification:
-    
-    if net_sentiment >= 0.17:  # Top 33% - most positive
+    if net_sentiment >= POSITIVE_NET_SENTIMENT:
         return "Positive"
-    elif net_sentiment <= 0.12:  # Bottom 33% - least positive (classified as negative)
+    elif net_sentiment <= NEGATIVE_NET_SENTIMENT:
         return "Negative"
     else:  # Middle 33%
         return "Neutral"
 
+def get_sentiments_batch(texts: List[str]) -> List[str]:
+    """Classify many texts at once: cached net scores, bucketed in one NumPy pass"""
+    net_sentiments = np.fromiter((get_net_sentiment(text) for text in texts), dtype=np.float64, count=len(texts))
+    return np.select(
+        [net_sentiments >= POSITIVE_NET_SENTIMENT, net_sentiments <= NEGATIVE_NET_SENTIMENT],
+        ["Positive", "Negative"],
+        default="Neutral"
+    ).tolist()
 
 DEFAULT_CALL_TYPE_CATEGORY_MAP = {
     "customer service": [
@@ -136,80 +334,266 @@ def get_agent_scoring_text(text: str) -> str:
     agent_text = identify_agent_segments(text)
     return agent_text.strip() if agent_text and agent_text.strip() else text
 
+@lru_cache(maxsize=32)
+def prepare_scoring_text(text: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """
+    Agent-only scoring text, its lowercased form and its words.
+    Cached so the rule-based and NLP scorers share one agent-segment pass,
+    one lowercase copy and one split of the same transcript.
+    """
+    scoring_text = get_agent_scoring_text(text)
+    transcript_lower = scoring_text.lower()
+    return scoring_text, transcript_lower, tuple(transcript_lower.split())
+
+# Phrase tables both QA scorers match exactly against the agent scoring text
+SCORING_PHRASE_TABLES = ('agent_behaviour_phrases', 'nlp_concepts')
+
+@lru_cache(maxsize=32)
+def get_scoring_phrase_positions(text: str) -> Dict[str, List[int]]:
+    """
+    Exact positions of every agent phrase and NLP concept in a transcript's
+    agent scoring text, from one automaton sweep shared by both scorers.
+    The returned dict is shared; callers must not modify it.
+    """
+    _, transcript_lower, _ = prepare_scoring_text(text)
+    return find_phrase_positions(SCORING_PHRASE_TABLES, transcript_lower)
 
 def get_scoring_categories(call_type: str, available_categories: List[str]) -> List[str]:
     """Return the categories that apply to the selected call type."""
-    config = load_config()
+    call_type_key = (call_type or '').strip().lower()
+    return list(resolve_scoring_categories(call_type_key, tuple(available_categories)))
+
+@lru_cache(maxsize=None)
+def resolve_scoring_categories(call_type_key: str, available_categories: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Resolve the category list for a normalised call type once.
+    Every call of a given type gets the same answer, so later calls are a dict lookup.
+    """
+    config = get_config()
     configured_map = config.get('call_type_category_map', {})
     normalized_map = {
         str(key).strip().lower(): value
         for key, value in configured_map.items()
         if isinstance(value, list)
     }
-    call_type_key = (call_type or '').strip().lower()
     desired_categories = normalized_map.get(call_type_key) or DEFAULT_CALL_TYPE_CATEGORY_MAP.get(call_type_key)
 
     if not desired_categories:
-        return list(available_categories)
+        return available_categories
 
     available_set = set(available_categories)
-    filtered_categories = [category for category in desired_categories if category in available_set]
-    return filtered_categories or list(available_categories)
+    filtered_categories = tuple(category for category in desired_categories if category in available_set)
+    return filtered_categories or available_categories
+
+def get_pii_patterns() -> List[Tuple[re.Pattern, str]]:
+    """Compile the configured PII patterns once, in config order, with their replacements"""
+    global _pii_patterns
+    if _pii_patterns is None:
+        config = get_config()
+        _pii_patterns = [
+            (re.compile(pattern_info['pattern'], re.IGNORECASE), pattern_info['replacement'])
+            for patterns in config.get('pii_patterns', {}).values()
+            for pattern_info in patterns
+        ]
+    return _pii_patterns
 
 def redact_pii(text: str) -> str:
     """Redact personally identifiable information from text"""
-    config = load_config()
+    config = get_config()
     if not config.get('security', {}).get('redact_pii', False):
         return text
     
     redacted_text = text
-    pii_patterns = config.get('pii_patterns', {})
-    
-    for category, patterns in pii_patterns.items():
-        for pattern_info in patterns:
-            pattern = pattern_info['pattern']
-            replacement = pattern_info['replacement']
-            redacted_text = re.sub(pattern, replacement, redacted_text, flags=re.IGNORECASE)
+    for pattern, replacement in get_pii_patterns():
+        redacted_text = pattern.sub(replacement, redacted_text)
     
     return redacted_text
 
+def get_phrase_automaton(*sections: str):
+    """Build the Aho-Corasick automaton over all phrases of one or more config phrase tables once"""
+    if sections not in _phrase_automata:
+        automaton = ahocorasick.Automaton()
+        for phrase_lower in get_flat_phrases(*sections):
+            automaton.add_word(phrase_lower, phrase_lower)
+        automaton.make_automaton()
+        _phrase_automata[sections] = automaton
+    return _phrase_automata[sections]
+
+def find_phrase_positions(sections, text_lower: str) -> Dict[str, List[int]]:
+    """
+    Find every (possibly overlapping) occurrence of every phrase in one config
+    phrase table, or a tuple of tables, with one sweep over the text.
+    Returns a dict of lowercased phrase -> ascending start positions.
+    """
+    if isinstance(sections, str):
+        sections = (sections,)
+    positions = {}
+    
+    if not AHOCORASICK_AVAILABLE:
+        for phrase_lower in get_flat_phrases(*sections):
+            positions[phrase_lower] = find_substring_positions(phrase_lower, text_lower)
+        return positions
+    
+    automaton = get_phrase_automaton(*sections)
+    if len(automaton) == 0:
+        return positions
+    
+    for end_index, phrase_lower in automaton.iter(text_lower):
+        positions.setdefault(phrase_lower, []).append(end_index + 1 - len(phrase_lower))
+    return positions
+
+def find_substring_positions(phrase_lower: str, text_lower: str) -> List[int]:
+    """Start positions of every (possibly overlapping) occurrence of a phrase"""
+    positions = []
+    start_pos = 0
+    while True:
+        pos = text_lower.find(phrase_lower, start_pos)
+        if pos == -1:
+            break
+        positions.append(pos)
+        start_pos = pos + 1
+    return positions
+
+def get_keyword_patterns() -> Tuple[re.Pattern, Dict[str, List[Tuple[str, re.Pattern]]]]:
+    """
+    Compile the keyword regexes once.
+    Returns a single alternation that finds every position where any keyword
+    starts, plus the per-keyword whole-word patterns grouped by first character.
+    """
+    global _keyword_patterns
+    if _keyword_patterns is None:
+        keywords_lower = get_flat_phrases('keywords')
+        # Longest first so the alternation prefers the longest keyword at each position
+        alternation = "|".join(
+            rf"{re.escape(keyword_lower)}\b"
+            for keyword_lower in sorted(keywords_lower, key=len, reverse=True)
+        )
+        start_pattern = re.compile(rf"\b(?=(?:{alternation}))")
+        patterns_by_first_char = {}
+        for keyword_lower in keywords_lower:
+            patterns_by_first_char.setdefault(keyword_lower[0], []).append(
+                (keyword_lower, re.compile(rf"\b{re.escape(keyword_lower)}\b"))
+            )
+        _keyword_patterns = (start_pattern, patterns_by_first_char)
+    return _keyword_patterns
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _is_word_boundary(text: str, pos: int) -> bool:
+    """Equivalent of a regex word-boundary assertion at text[pos]"""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+def find_exact_keyword_spans(text_lower: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Find whole-word occurrences of every configured keyword in a single pass.
+    Returns a dict of lowercased keyword -> list of (start, end) spans.
+    """
+    spans = {}
+    
+    if not AHOCORASICK_AVAILABLE:
+        start_pattern, patterns_by_first_char = get_keyword_patterns()
+        if not patterns_by_first_char:
+            return spans
+        
+        # One scan finds every candidate start; only keywords sharing the
+        # first character are then tried at that position
+        last_end = {}
+        for candidate in start_pattern.finditer(text_lower):
+            pos = candidate.start()
+            for keyword_lower, pattern in patterns_by_first_char.get(text_lower[pos], []):
+                if pos < last_end.get(keyword_lower, 0):
+                    continue
+                match = pattern.match(text_lower, pos)
+                if match:
+                    spans.setdefault(keyword_lower, []).append((pos, match.end()))
+                    last_end[keyword_lower] = match.end()
+        return spans
+    
+    automaton = get_phrase_automaton('keywords')
+    if len(automaton) == 0:
+        return spans
+    
+    # Hits arrive ordered by end position; skip overlapping repeats of the
+    # same keyword so results match re.finditer
+    last_end = {}
+    for end_index, keyword_lower in automaton.iter(text_lower):
+        end = end_index + 1
+        start = end - len(keyword_lower)
+        if start < last_end.get(keyword_lower, 0):
+            continue
+        if _is_word_boundary(text_lower, start) and _is_word_boundary(text_lower, end):
+            spans.setdefault(keyword_lower, []).append((start, end))
+            last_end[keyword_lower] = end
+    
+    return spans
+
+# Confidence multiplier for each keyword priority tier in config.yaml
+KEYWORD_PRIORITY_WEIGHTS = {'high_priority': 1.0, 'medium_priority': 0.8, 'low_priority': 0.6}
+DEFAULT_KEYWORD_PRIORITY_WEIGHT = 0.5
+
 def find_keywords_enhanced(text: str) -> List[Dict[str, Any]]:
     """Enhanced keyword detection with confidence scoring and fuzzy matching"""
-    config = load_config()
+    config = get_config()
     keywords_config = config.get('keywords', {})
-    confidence_threshold = config.get('scoring', {}).get('keyword_confidence_threshold', 0.6)
-    fuzzy_threshold = config.get('scoring', {}).get('fuzzy_threshold', 80)
+    settings = get_scoring_settings()
+    confidence_threshold = settings.keyword_confidence_threshold
+    fuzzy_threshold = settings.fuzzy_threshold
     
     text_lower = text.lower()
     matches = []
     
+    exact_spans = find_exact_keyword_spans(text_lower)
+    keywords_lower = get_lowercase_phrases('keywords')
+    # Index every whitespace-delimited token by its start offsets in one pass;
+    # each distinct word is scored once and a hit is reported at every occurrence
+    word_starts = {}
+    for token in re.finditer(r'\S+', text_lower):
+        word_starts.setdefault(token.group(), []).append(token.start())
+    words = tuple(word_starts)
+    
     # Process keywords by priority
     for priority, keywords in keywords_config.items():
-        priority_weight = {'high_priority': 1.0, 'medium_priority': 0.8, 'low_priority': 0.6}.get(priority, 0.5)
+        priority_weight = KEYWORD_PRIORITY_WEIGHTS.get(priority, DEFAULT_KEYWORD_PRIORITY_WEIGHT)
+        priority_keywords_lower = keywords_lower[priority]
         
-        for keyword in keywords:
+        # Score every keyword of this priority against every word in one batch;
+        # scores below the cutoff come back as 0
+        fuzzy_scores = process.cdist(
+            priority_keywords_lower,
+            words,
+            scorer=fuzz.ratio,
+            score_cutoff=fuzzy_threshold,
+            dtype=np.float64,
+            workers=_fuzzy_workers
+        ) if priority_keywords_lower and words else None
+        
+        for keyword_index, (keyword, keyword_lower) in enumerate(zip(keywords, priority_keywords_lower)):
             # Exact match
-            pattern = rf"\b{re.escape(keyword.lower())}\b"
-            for match in re.finditer(pattern, text_lower):
+            for start, end in exact_spans.get(keyword_lower, []):
                 confidence = priority_weight
                 matches.append({
                     "phrase": keyword,
-                    "start": match.start(),
-                    "end": match.end(),
+                    "start": start,
+                    "end": end,
                     "confidence": confidence,
                     "match_type": "exact",
                     "priority": priority
                 })
             
+            if fuzzy_scores is None:
+                continue
+            
             # Fuzzy match for potential variations
-            words = text_lower.split()
-            for i, word in enumerate(words):
-                ratio = fuzz.ratio(keyword.lower(), word)
-                if ratio >= fuzzy_threshold:
-                    confidence = (ratio / 100) * priority_weight
-                    if confidence >= confidence_threshold:
-                        # Find position in original text
-                        word_start = text_lower.find(word)
+            row = fuzzy_scores[keyword_index]
+            for i in np.flatnonzero(row >= fuzzy_threshold):
+                ratio = float(row[i])
+                confidence = (ratio / 100) * priority_weight
+                if confidence >= confidence_threshold:
+                    word = words[i]
+                    for word_start in word_starts[word]:
                         matches.append({
                             "phrase": keyword,
                             "matched_text": word,
@@ -221,58 +605,113 @@ def find_keywords_enhanced(text: str) -> List[Dict[str, Any]]:
                             "fuzzy_ratio": ratio
                         })
     
-    # Remove duplicates and sort by confidence
-    seen = set()
+    # Resolve overlapping spans in one sweep by start offset: where spans overlap,
+    # the higher-confidence match is kept (the earlier one on a tie), so the
+    # transcript highlighter never receives nested or crossing spans
+    matches.sort(key=lambda x: (x['start'], -x['confidence']))
     unique_matches = []
     for match in matches:
-        key = (match['start'], match['end'])
-        if key not in seen:
-            seen.add(key)
-            unique_matches.append(match)
+        if unique_matches and match['start'] < unique_matches[-1]['end']:
+            if match['confidence'] > unique_matches[-1]['confidence']:
+                unique_matches[-1] = match
+            continue
+        unique_matches.append(match)
     
     return sorted(unique_matches, key=lambda x: x['confidence'], reverse=True)
 
+def _parse_for_similarity(text: str):
+    nlp = load_spacy_model()
+    return nlp(text, disable=get_unused_components(nlp, SIMILARITY_COMPONENTS))
+
+# Scoring compares every phrase of every category against the same transcript:
+# phrases recur across calls, while only the current transcript needs keeping
+_phrase_similarity_doc = lru_cache(maxsize=2048)(_parse_for_similarity)
+_text_similarity_doc = lru_cache(maxsize=4)(_parse_for_similarity)
+
+@lru_cache(maxsize=4096)
+def _cached_similarity(text1: str, text2: str) -> float:
+    # Raises on pipeline failure so errors are not cached
+    return _phrase_similarity_doc(text1).similarity(_text_similarity_doc(text2))
+
 def get_semantic_similarity(text1: str, text2: str) -> float:
-    """Calculate semantic similarity between two texts using spaCy"""
+    """
+    Calculate semantic similarity between two texts using spaCy.
+    text1 is the short side (a config phrase) and text2 the longer text; both
+    Docs are cached so a transcript is parsed once for all its phrases, and
+    scores are memoised for phrases shared by several categories or tables.
+    """
     try:
-        nlp = load_spacy_model()
-        doc1 = nlp(text1)
-        doc2 = nlp(text2)
-        return doc1.similarity(doc2)
+        return _cached_similarity(text1, text2)
     except Exception as e:
         print(f"Warning: Could not calculate semantic similarity: {e}")
         return 0.0
 
-def match_any_enhanced(phrases: List[str], text: str, use_semantic: bool = True) -> Tuple[bool, float, str]:
-    """Enhanced matching with fuzzy and semantic similarity"""
-    config = load_config()
-    fuzzy_threshold = config.get('scoring', {}).get('fuzzy_threshold', 80)
-    semantic_threshold = config.get('scoring', {}).get('semantic_threshold', 0.7)
+@lru_cache(maxsize=256)
+def _phrase_vectors(phrases: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stacked Doc vectors of a phrase list and their norms (raises on pipeline failure, so errors are not cached)"""
+    docs = [_phrase_similarity_doc(phrase) for phrase in phrases]
+    return np.vstack([doc.vector for doc in docs]), np.array([doc.vector_norm for doc in docs], dtype=np.float32)
+
+def get_semantic_similarities(phrases: Sequence[str], text: str, fallback: bool = True) -> np.ndarray:
+    """
+    Semantic similarity of every phrase to text as one matrix-vector product.
+    Same cosine of mean vectors as Doc.similarity, with zero vectors scoring 0.0;
+    the stacked phrase vectors are cached per phrase list.
+    On pipeline failure all scores are 0.0, or the error is raised if fallback=False.
+    """
+    if not phrases:
+        return np.zeros(0)
+    try:
+        vectors, norms = _phrase_vectors(tuple(phrases))
+        text_doc = _text_similarity_doc(text)
+        text_norm = text_doc.vector_norm
+        if text_norm == 0 or vectors.shape[1] == 0:
+            return np.zeros(len(phrases))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarities = (vectors @ text_doc.vector) / (norms * text_norm)
+        return np.where(norms > 0, similarities, 0.0)
+    except Exception as e:
+        if not fallback:
+            raise
+        print(f"Warning: Could not calculate semantic similarity: {e}")
+        return np.zeros(len(phrases))
+
+def match_any_enhanced(phrases: List[str], text: str, use_semantic: bool = True,
+                       phrases_lower: Optional[Sequence[str]] = None) -> Tuple[bool, float, str]:
+    """
+    Enhanced matching with fuzzy and semantic similarity.
+    Pass phrases_lower (e.g. from get_lowercase_phrases) to skip lowercasing the phrases.
+    """
+    settings = get_scoring_settings()
+    fuzzy_threshold = settings.fuzzy_threshold
+    semantic_threshold = settings.semantic_threshold
     
     best_match = ""
     best_score = 0.0
     found_match = False
     
     text_lower = text.lower()
+    if phrases_lower is None:
+        phrases_lower = [phrase.lower() for phrase in phrases]
     
-    for phrase in phrases:
-        phrase_lower = phrase.lower()
-        
-        # Exact substring match
+    # Exact substring match
+    for phrase, phrase_lower in zip(phrases, phrases_lower):
         if phrase_lower in text_lower:
             return True, 1.0, phrase
-        
-        # Fuzzy matching
-        fuzzy_score = fuzz.partial_ratio(phrase_lower, text_lower)
-        if fuzzy_score >= fuzzy_threshold:
-            normalized_score = fuzzy_score / 100
-            if normalized_score > best_score:
-                best_score = normalized_score
-                best_match = phrase
-                found_match = True
-        
-        # Semantic similarity (if enabled and spaCy is available)
-        if use_semantic:
+    
+    # Fuzzy matching (rapidfuzz scores all phrases in a single C++ call)
+    fuzzy_result = process.extractOne(
+        text_lower, phrases_lower, scorer=fuzz.partial_ratio, score_cutoff=fuzzy_threshold
+    )
+    if fuzzy_result is not None:
+        _, fuzzy_score, index = fuzzy_result
+        best_score = fuzzy_score / 100
+        best_match = phrases[index]
+        found_match = True
+    
+    # Semantic similarity (if enabled and spaCy is available)
+    if use_semantic:
+        for phrase in phrases:
             try:
                 semantic_score = get_semantic_similarity(phrase, text)
                 if semantic_score >= semantic_threshold:
@@ -285,29 +724,98 @@ def match_any_enhanced(phrases: List[str], text: str, use_semantic: bool = True)
     
     return found_match, best_score, best_match
 
-def count_phrase_occurrences(phrases: List[str], text: str, use_semantic: bool = False) -> Dict[str, Any]:
+@lru_cache(maxsize=16)
+def get_word_windows(words: Tuple[str, ...], window_length: int) -> Tuple[str, ...]:
+    """
+    Every run of window_length consecutive words, joined with spaces.
+    Cached because each category and phrase table of a transcript asks for the same windows.
+    """
+    return tuple(' '.join(words[i:i+window_length]) for i in range(len(words) - window_length + 1))
+
+def score_phrase_windows(phrases_lower: Sequence[str], words: Tuple[str, ...],
+                         fuzzy_threshold: float) -> Dict[str, Tuple[Tuple[str, ...], np.ndarray]]:
+    """
+    Fuzzy-score every multi-word phrase against every same-length word window.
+    Runs one rapidfuzz cdist call per window length instead of one call per pair.
+    Returns {phrase_lower: (windows, scores)}, with scores below the cutoff as 0.
+    Pass the phrase lists of several tables together to share the batch.
+    """
+    phrases_by_length = {}
+    for phrase_lower in dict.fromkeys(phrases_lower):
+        phrase_length = len(phrase_lower.split())
+        if 1 < phrase_length <= len(words):
+            phrases_by_length.setdefault(phrase_length, []).append(phrase_lower)
+    
+    window_scores = {}
+    for phrase_length, length_phrases in phrases_by_length.items():
+        windows = get_word_windows(words, phrase_length)
+        score_matrix = process.cdist(
+            length_phrases,
+            windows,
+            scorer=fuzz.ratio,
+            score_cutoff=fuzzy_threshold,
+            dtype=np.float64,
+            workers=_fuzzy_workers
+        )
+        for phrase_lower, row in zip(length_phrases, score_matrix):
+            window_scores[phrase_lower] = (windows, row)
+    return window_scores
+
+def count_phrase_occurrences(phrases: List[str], text: str, use_semantic: bool = False,
+                             phrases_lower: Optional[Sequence[str]] = None,
+                             exact_positions: Optional[Dict[str, List[int]]] = None,
+                             text_is_lower: bool = False,
+                             use_fuzzy: bool = True,
+                             words: Optional[Tuple[str, ...]] = None,
+                             window_scores: Optional[Dict[str, Tuple[Tuple[str, ...], np.ndarray]]] = None,
+                             fallback: bool = True) -> Dict[str, Any]:
     """
     Count how many times phrases/concepts appear in text with semantic understanding.
     Returns frequency, matches, and distribution across the text.
+    Pass phrases_lower (e.g. from get_lowercase_phrases) to skip lowercasing the phrases,
+    exact_positions (from find_phrase_positions) to reuse a single substring sweep,
+    and text_is_lower=True when the caller has already lowercased the text.
+    use_fuzzy=False skips the sliding-window fuzzy pass (exact matches only).
+    words (e.g. from prepare_scoring_text) reuses an existing split of the lowercased text.
+    window_scores (from score_phrase_windows) reuses fuzzy scores batched with other phrase lists.
+    fallback=False raises semantic similarity failures instead of scoring them as 0.0.
     """
-    config = load_config()
-    fuzzy_threshold = config.get('scoring', {}).get('fuzzy_threshold', 80)
-    semantic_threshold = config.get('scoring', {}).get('semantic_threshold', 0.7)
+    settings = get_scoring_settings()
+    fuzzy_threshold = settings.fuzzy_threshold
+    semantic_threshold = settings.semantic_threshold
     
-    text_lower = text.lower()
+    text_lower = text if text_is_lower else text.lower()
     total_matches = []
     match_positions = []
+    # Positional matches recorded so far, so fuzzy hits can be de-duplicated
+    # without rebuilding a list of every match's position per window
+    seen_positions = set()
+    # Running confidence total, so the average needs no pass over the matches
+    confidence_sum = 0.0
     text_length = len(text)
     
-    for phrase in phrases:
-        phrase_lower = phrase.lower()
+    if words is None:
+        words = tuple(text_lower.split())
+    if phrases_lower is None:
+        phrases_lower = [phrase.lower() for phrase in phrases]
+    
+    if not use_fuzzy:
+        window_scores = {}
+    elif window_scores is None:
+        window_scores = score_phrase_windows(phrases_lower, tuple(words), fuzzy_threshold)
+    
+    # Every phrase's similarity to the text in one batch
+    semantic_scores = get_semantic_similarities(phrases, text, fallback=fallback) if use_semantic else None
+    
+    for index, phrase in enumerate(phrases):
+        phrase_lower = phrases_lower[index]
         
         # Exact substring matches
-        start_pos = 0
-        while True:
-            pos = text_lower.find(phrase_lower, start_pos)
-            if pos == -1:
-                break
+        if exact_positions is not None:
+            positions = exact_positions.get(phrase_lower, [])
+        else:
+            positions = find_substring_positions(phrase_lower, text_lower)
+        for pos in positions:
             total_matches.append({
                 'phrase': phrase,
                 'position': pos,
@@ -315,44 +823,43 @@ def count_phrase_occurrences(phrases: List[str], text: str, use_semantic: bool =
                 'type': 'exact'
             })
             match_positions.append(pos)
-            start_pos = pos + 1
+            seen_positions.add(pos)
+            confidence_sum += 1.0
         
         # Fuzzy matches (find similar phrases)
-        words = text_lower.split()
-        phrase_words = phrase_lower.split()
-        
-        # Sliding window for multi-word phrases
-        if len(phrase_words) > 1:
-            for i in range(len(words) - len(phrase_words) + 1):
-                window = ' '.join(words[i:i+len(phrase_words)])
-                fuzzy_score = fuzz.ratio(phrase_lower, window)
-                if fuzzy_score >= fuzzy_threshold:
-                    # Estimate position
-                    estimated_pos = text_lower.find(window)
-                    if estimated_pos != -1 and estimated_pos not in [m['position'] for m in total_matches]:
-                        total_matches.append({
-                            'phrase': phrase,
-                            'matched_text': window,
-                            'position': estimated_pos,
-                            'confidence': fuzzy_score / 100,
-                            'type': 'fuzzy'
-                        })
-                        match_positions.append(estimated_pos)
-        
-        # Semantic similarity (if enabled)
-        if use_semantic:
-            try:
-                semantic_score = get_semantic_similarity(phrase, text)
-                if semantic_score >= semantic_threshold:
-                    # Add as a general semantic match
+        # Sliding window for multi-word phrases, scored above
+        if phrase_lower in window_scores:
+            windows, row = window_scores[phrase_lower]
+            for i in np.flatnonzero(row >= fuzzy_threshold):
+                window = windows[i]
+                confidence = float(row[i]) / 100
+                
+                # Estimate position
+                estimated_pos = text_lower.find(window)
+                if estimated_pos != -1 and estimated_pos not in seen_positions:
                     total_matches.append({
                         'phrase': phrase,
-                        'position': -1,  # Semantic match doesn't have specific position
-                        'confidence': semantic_score,
-                        'type': 'semantic'
+                        'matched_text': window,
+                        'position': estimated_pos,
+                        'confidence': confidence,
+                        'type': 'fuzzy'
                     })
-            except Exception:
-                pass
+                    match_positions.append(estimated_pos)
+                    seen_positions.add(estimated_pos)
+                    confidence_sum += confidence
+        
+        # Semantic similarity (if enabled)
+        if use_semantic:
+            semantic_score = float(semantic_scores[index])
+            if semantic_score >= semantic_threshold:
+                # Add as a general semantic match
+                total_matches.append({
+                    'phrase': phrase,
+                    'position': -1,  # Semantic match doesn't have specific position
+                    'confidence': semantic_score,
+                    'type': 'semantic'
+                })
+                confidence_sum += semantic_score
     
     # Calculate distribution (how spread out are matches?)
     distribution_score = 0.0
@@ -366,7 +873,7 @@ def count_phrase_occurrences(phrases: List[str], text: str, use_semantic: bool =
         distribution_score = len(segments_with_matches) / 5.0
     
     # Get average confidence
-    avg_confidence = np.mean([m['confidence'] for m in total_matches]) if total_matches else 0.0
+    avg_confidence = confidence_sum / len(total_matches) if total_matches else 0.0
     
     return {
         'frequency': len(total_matches),
@@ -381,19 +888,33 @@ def score_call_rule_based(text: str, call_type: str) -> Dict[str, Dict[str, Any]
     Enhanced rule-based QA scoring with frequency thresholds.
     Now requires multiple mentions for full credit.
     """
-    config = load_config()
+    config = get_config()
     agent_phrases = config.get('agent_behaviour_phrases', {})
     categories = get_scoring_categories(call_type, list(agent_phrases.keys()))
 
-    min_full = config.get('scoring', {}).get('min_frequency_for_full_score', 2)
-    min_partial = config.get('scoring', {}).get('min_frequency_for_partial_score', 1)
+    settings = get_scoring_settings()
+    min_full = settings.min_frequency_for_full_score
+    min_partial = settings.min_frequency_for_partial_score
+    exact_only_categories = settings.exact_only_categories
 
-    transcript = get_agent_scoring_text(text).lower()
+    agent_phrases_lower = get_lowercase_phrases('agent_behaviour_phrases')
+
+    _, transcript, words = prepare_scoring_text(text)
+    phrase_positions = get_scoring_phrase_positions(text)
     scores = {}
 
     for category in categories:
         phrases = agent_phrases.get(category, [])
-        occurrence_data = count_phrase_occurrences(phrases, transcript, use_semantic=False)
+        occurrence_data = count_phrase_occurrences(
+            phrases,
+            transcript,
+            use_semantic=False,
+            phrases_lower=agent_phrases_lower.get(category, []),
+            exact_positions=phrase_positions,
+            text_is_lower=True,
+            use_fuzzy=category not in exact_only_categories,
+            words=words
+        )
 
         frequency = occurrence_data['frequency']
         matches = occurrence_data['matches']
@@ -423,22 +944,26 @@ def score_call_rule_based(text: str, call_type: str) -> Dict[str, Dict[str, Any]
 
     return scores
 
-def score_call_nlp_enhanced(text: str, call_type: str) -> Dict[str, Dict[str, Any]]:
+def score_call_nlp_enhanced(text: str, call_type: str, doc=None, fallback: bool = True) -> Dict[str, Dict[str, Any]]:
     """
     Enhanced NLP-based scoring using Option A: Frequency × Semantic × Distribution.
     Provides holistic 0-1.0 score based on conversation-wide analysis.
+    Pass doc (the parsed agent scoring text) to reuse a Doc from a batched nlp.pipe run.
+    On NLP failure rule-based scores are returned, or the error is raised if fallback=False.
     """
-    config = load_config()
+    config = get_config()
     agent_phrases = config.get('agent_behaviour_phrases', {})
     nlp_concepts = config.get('nlp_concepts', {})
     categories = get_scoring_categories(call_type, list(agent_phrases.keys()))
 
-    freq_weight = config.get('scoring', {}).get('nlp_frequency_weight', 0.4)
-    semantic_weight = config.get('scoring', {}).get('nlp_semantic_weight', 0.35)
-    distribution_weight = config.get('scoring', {}).get('nlp_distribution_weight', 0.25)
+    settings = get_scoring_settings()
+    freq_weight = settings.nlp_frequency_weight
+    semantic_weight = settings.nlp_semantic_weight
+    distribution_weight = settings.nlp_distribution_weight
+    exact_only_categories = settings.exact_only_categories
 
-    scoring_text = get_agent_scoring_text(text)
-    word_count = len(scoring_text.split())
+    scoring_text, transcript_lower, words = prepare_scoring_text(text)
+    word_count = len(words)
     estimated_minutes = word_count / 150 if word_count else 0
 
     if estimated_minutes < 5:
@@ -448,19 +973,38 @@ def score_call_nlp_enhanced(text: str, call_type: str) -> Dict[str, Dict[str, An
     else:
         expected_frequency = 3
 
-    transcript_lower = scoring_text.lower()
+    agent_phrases_lower = get_lowercase_phrases('agent_behaviour_phrases')
+    nlp_concepts_lower = get_lowercase_phrases('nlp_concepts')
+
+    # Phrases and concepts share one automaton, so the transcript is swept once
+    phrase_positions = get_scoring_phrase_positions(text)
     scores = {}
 
     try:
-        nlp = load_spacy_model()
-        doc = nlp(scoring_text)
+        if doc is None:
+            nlp = load_spacy_model()
+            doc = nlp(scoring_text, disable=get_unused_components(nlp, ENTITY_COMPONENTS))
         entities = [ent.text.lower() for ent in doc.ents]
 
         for category in categories:
+            use_fuzzy = category not in exact_only_categories
+            phrases_lower = agent_phrases_lower.get(category, ())
+            concepts_lower = nlp_concepts_lower.get(category, ())
+            # Phrases and concepts share one fuzzy cdist batch per window length
+            window_scores = score_phrase_windows(
+                phrases_lower + concepts_lower, words, settings.fuzzy_threshold
+            ) if use_fuzzy else None
             phrase_data = count_phrase_occurrences(
                 agent_phrases.get(category, []),
                 transcript_lower,
-                use_semantic=True
+                use_semantic=True,
+                phrases_lower=phrases_lower,
+                exact_positions=phrase_positions,
+                text_is_lower=True,
+                use_fuzzy=use_fuzzy,
+                words=words,
+                window_scores=window_scores,
+                fallback=fallback
             )
             phrase_frequency = phrase_data['frequency']
             phrase_distribution = phrase_data['distribution']
@@ -469,17 +1013,26 @@ def score_call_nlp_enhanced(text: str, call_type: str) -> Dict[str, Dict[str, An
             concept_data = count_phrase_occurrences(
                 nlp_concepts.get(category, []),
                 transcript_lower,
-                use_semantic=True
+                use_semantic=True,
+                phrases_lower=concepts_lower,
+                exact_positions=phrase_positions,
+                text_is_lower=True,
+                use_fuzzy=use_fuzzy,
+                words=words,
+                window_scores=window_scores,
+                fallback=fallback
             )
             concept_frequency = concept_data['frequency']
             concept_confidence = concept_data['avg_confidence']
 
             entity_relevance = 0.0
             if entities:
+                category_word = category.lower().split()[0]
+                top_concepts = concepts_lower[:5]
                 relevant_entities = [
                     entity for entity in entities
-                    if category.lower().split()[0] in entity
-                    or any(concept.lower() in entity for concept in nlp_concepts.get(category, [])[:5])
+                    if category_word in entity
+                    or any(concept in entity for concept in top_concepts)
                 ]
                 entity_relevance = min(len(relevant_entities) / 3, 1.0)
 
@@ -533,92 +1086,200 @@ def score_call_nlp_enhanced(text: str, call_type: str) -> Dict[str, Dict[str, An
             }
 
     except Exception as e:
+        if not fallback:
+            raise
         print(f"Warning: NLP analysis failed, falling back to rule-based: {e}")
         return score_call_rule_based(text, call_type)
 
     return scores
 
-def extract_nlp_insights(text: str) -> Dict[str, Any]:
-    """Extract comprehensive NLP insights from text"""
+def score_calls_bulk(texts: List[str], call_type: str, use_nlp: bool = False,
+                     workers: Optional[int] = None, chunksize: int = 4) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Score many transcripts across worker processes.
+    Each transcript is scored independently, so the work spreads over all CPU cores.
+    Results are returned in the same order as the input texts.
+    """
+    scorer = score_call_nlp_enhanced if use_nlp else score_call_rule_based
+    texts = list(texts)
+    max_workers = workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(texts) <= 1:
+        return [scorer(text, call_type) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+        return list(executor.map(partial(scorer, call_type=call_type), texts, chunksize=chunksize))
+
+def score_calls_nlp_batch(texts: List[str], call_type: str, batch_size: int = 64,
+                          n_process: int = 1) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    NLP-score many transcripts with a single batched spaCy run.
+    The agent scoring texts are parsed together through nlp.pipe (entity
+    components only) and each Doc is handed to score_call_nlp_enhanced.
+    """
+    texts = list(texts)
     try:
         nlp = load_spacy_model()
-        doc = nlp(text)
-        
-        insights = {
-            "entities": [],
-            "sentiment_breakdown": {},
-            "key_phrases": [],
-            "emotional_indicators": [],
-            "complexity_score": 0.0
+        docs = list(nlp.pipe(
+            (prepare_scoring_text(text)[0] for text in texts),
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=get_unused_components(nlp, ENTITY_COMPONENTS)
+        ))
+    except Exception as e:
+        print(f"Warning: Batched NLP parsing failed, scoring one call at a time: {e}")
+        return [score_call_nlp_enhanced(text, call_type) for text in texts]
+    
+    return [score_call_nlp_enhanced(text, call_type, doc=doc) for text, doc in zip(texts, docs)]
+
+def score_calls(texts: Iterable[str], call_type: str, use_nlp: bool = False) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """Yield QA scores one transcript at a time so results can be written out incrementally"""
+    scorer = score_call_nlp_enhanced if use_nlp else score_call_rule_based
+    for text in texts:
+        yield scorer(text, call_type)
+
+def empty_nlp_insights() -> Dict[str, Any]:
+    """Insights structure returned when NLP analysis is unavailable"""
+    return {
+        "entities": [],
+        "sentiment_breakdown": {},
+        "key_phrases": [],
+        "emotional_indicators": [],
+        "complexity_score": 0.0
+    }
+
+EMOTIONAL_WORDS = frozenset({
+    "worried", "anxious", "stressed", "frustrated", "angry",
+    "upset", "concerned", "happy", "satisfied", "pleased"
+})
+EMOTIONAL_WORD_IDS = np.array([get_string_id(word) for word in sorted(EMOTIONAL_WORDS)], dtype=np.uint64)
+
+# spacy.explain looks labels up in its glossary; entity labels repeat, so memoise
+explain_label = lru_cache(maxsize=None)(spacy.explain)
+
+def build_nlp_insights(doc, text: str) -> Dict[str, Any]:
+    """Build the NLP insights dict from an already-processed spaCy Doc"""
+    insights = empty_nlp_insights()
+    
+    # Named entities
+    for ent in doc.ents:
+        insights["entities"].append({
+            "text": ent.text,
+            "label": ent.label_,
+            "description": explain_label(ent.label_)
+        })
+    
+    # Sentence-level sentiment
+    sentences = [sent.text for sent in doc.sents]
+    for i, (sentence, sentiment) in enumerate(zip(sentences, get_sentiments_batch(sentences))):
+        insights["sentiment_breakdown"][f"sentence_{i+1}"] = {
+            "text": sentence[:100] + "..." if len(sentence) > 100 else sentence,
+            "sentiment": sentiment
         }
-        
-        # Named entities
-        for ent in doc.ents:
-            insights["entities"].append({
-                "text": ent.text,
-                "label": ent.label_,
-                "description": spacy.explain(ent.label_) if hasattr(spacy, 'explain') else ent.label_
-            })
-        
-        # Sentence-level sentiment
-        sentences = [sent.text for sent in doc.sents]
-        for i, sentence in enumerate(sentences):
-            sentiment = get_sentiment(sentence)
-            insights["sentiment_breakdown"][f"sentence_{i+1}"] = {
-                "text": sentence[:100] + "..." if len(sentence) > 100 else sentence,
-                "sentiment": sentiment
-            }
-        
-        # Key phrases (noun chunks with significance)
-        for chunk in doc.noun_chunks:
-            if len(chunk.text.split()) > 1:  # Multi-word phrases
-                insights["key_phrases"].append(chunk.text)
-        
-        # Emotional indicators
-        emotional_words = ["worried", "anxious", "stressed", "frustrated", "angry", "upset", "concerned", "happy", "satisfied", "pleased"]
-        for token in doc:
-            if token.text.lower() in emotional_words:
-                insights["emotional_indicators"].append({
-                    "word": token.text,
-                    "lemma": token.lemma_,
-                    "context": text[max(0, token.idx-50):token.idx+50]
-                })
-        
-        # Text complexity (based on sentence length and vocabulary diversity)
-        avg_sentence_length = np.mean([len(sent.text.split()) for sent in doc.sents])
-        unique_words = len(set(token.text.lower() for token in doc if token.is_alpha))
-        total_words = len([token for token in doc if token.is_alpha])
-        lexical_diversity = unique_words / total_words if total_words > 0 else 0
-        
-        complexity_score = min(1.0, (avg_sentence_length / 20) * 0.5 + lexical_diversity * 0.5)
-        insights["complexity_score"] = complexity_score
-        
-        return insights
-        
+    
+    # Key phrases (noun chunks with significance)
+    for chunk in doc.noun_chunks:
+        if len(chunk.text.split(maxsplit=1)) > 1:  # Multi-word phrases
+            insights["key_phrases"].append(chunk.text)
+    
+    # Columnar token attributes (lowercase hash, is_alpha), read once for the
+    # emotional indicators and the vocabulary counts below
+    token_attrs = doc.to_array([LOWER, IS_ALPHA])
+    
+    # Emotional indicators: compare lowercase hashes in C, only build
+    # Python objects for the tokens that match
+    for i in np.flatnonzero(np.isin(token_attrs[:, 0], EMOTIONAL_WORD_IDS)):
+        token = doc[int(i)]
+        insights["emotional_indicators"].append({
+            "word": token.text,
+            "lemma": token.lemma_,
+            "context": text[max(0, token.idx-50):token.idx+50]
+        })
+    
+    # Text complexity (based on sentence length and vocabulary diversity)
+    avg_sentence_length = np.mean([len(sentence.split()) for sentence in sentences])
+    alpha_mask = token_attrs[:, 1].astype(bool)
+    total_words = int(alpha_mask.sum())
+    unique_words = int(np.unique(token_attrs[alpha_mask, 0]).size)
+    lexical_diversity = unique_words / total_words if total_words > 0 else 0
+    
+    complexity_score = min(1.0, (avg_sentence_length / 20) * 0.5 + lexical_diversity * 0.5)
+    insights["complexity_score"] = complexity_score
+    
+    return insights
+
+def extract_nlp_insights_stream(texts: Iterable[str], batch_size: int = 64,
+                                n_process: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Yield NLP insights one transcript at a time.
+    Texts are fed through spaCy's nlp.pipe lazily, so only one batch of Docs is held in memory.
+    Raises if the spaCy model cannot be loaded or the pipeline fails.
+    """
+    nlp = load_spacy_model()
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        try:
+            yield build_nlp_insights(doc, doc.text)
+        except Exception as e:
+            print(f"Warning: Could not extract NLP insights: {e}")
+            yield empty_nlp_insights()
+
+def extract_nlp_insights_batch(texts: List[str], batch_size: int = 64, n_process: int = 1) -> List[Dict[str, Any]]:
+    """
+    Extract NLP insights for many transcripts at once.
+    Uses spaCy's nlp.pipe so tokenizer and model overhead is shared across the batch.
+    """
+    texts = list(texts)
+    try:
+        return list(extract_nlp_insights_stream(texts, batch_size=batch_size, n_process=n_process))
     except Exception as e:
         print(f"Warning: Could not extract NLP insights: {e}")
-        return {
-            "entities": [],
-            "sentiment_breakdown": {},
-            "key_phrases": [],
-            "emotional_indicators": [],
-            "complexity_score": 0.0
-        }
+        return [empty_nlp_insights() for _ in texts]
+
+def extract_nlp_insights(text: str, fallback: bool = True) -> Dict[str, Any]:
+    """
+    Extract comprehensive NLP insights from text.
+    On failure empty insights are returned, or the error is raised if fallback=False.
+    """
+    try:
+        nlp = load_spacy_model()
+        return build_nlp_insights(nlp(text), text)
+    except Exception as e:
+        if not fallback:
+            raise
+        print(f"Warning: Could not extract NLP insights: {e}")
+        return empty_nlp_insights()
 
 # Maintain backward compatibility
-def find_keywords(text: str) -> List[Dict[str, Any]]:
+@dataclass
+class KeywordHit:
+    """Compact keyword match returned by find_keywords (phrase and character span)"""
+    # Declared by hand rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ("phrase", "start", "end")
+    phrase: str
+    start: int
+    end: int
+
+    def __getitem__(self, key: str):
+        # Keep dict-style access (hit["phrase"]) working for older callers
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"phrase": self.phrase, "start": self.start, "end": self.end}
+
+def find_keywords(text: str) -> List[KeywordHit]:
     """Backward compatible keyword finding"""
     enhanced_matches = find_keywords_enhanced(text)
     # Convert to old format for compatibility
     return [
-        {
-            "phrase": match["phrase"],
-            "start": match["start"],
-            "end": match["end"]
-        }
+        KeywordHit(match["phrase"], match["start"], match["end"])
         for match in enhanced_matches
     ]
 
+def find_keywords_stream(texts: Iterable[str]) -> Iterator[List[Dict[str, Any]]]:
+    """Yield enhanced keyword matches one transcript at a time"""
+    for text in texts:
+        yield find_keywords_enhanced(text)
+
 def score_call(text: str, call_type: str) -> Dict[str, Dict[str, Any]]:
     """Backward compatible rule-based scoring"""
     return score_call_rule_based(text, call_type)
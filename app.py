@@ -4,7 +4,10 @@ import streamlit as st
 st.set_page_config(page_title="Call Analysis Scorecard", layout="wide", initial_sidebar_state="expanded")
 
 import os
+import html
+import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 import torch
 import numpy as np
 import yaml
@@ -12,11 +15,14 @@ from pathlib import Path
 import logging
 from typing import Dict, List, Any
 
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
 # Import our modules
-from transcriber import transcribe_audio, set_model_size, validate_audio_file, cleanup_temp_files
+from transcriber import transcribe_audio, set_model_size, unload_models, validate_audio_file, cleanup_temp_files
 from analyser import (
     get_sentiment, find_keywords_enhanced, score_call_rule_based, 
-    score_call_nlp_enhanced, extract_nlp_insights, redact_pii, load_config
+    score_call_nlp_enhanced, extract_nlp_insights, empty_nlp_insights, redact_pii, load_config,
+    preload_spacy_model, set_fuzzy_workers
 )
 from pdf_exporter import generate_pdf_report, generate_combined_pdf_report
 
@@ -29,6 +35,13 @@ from datetime import date
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keyword highlight colour per priority - improved colors for better readability
+HIGHLIGHT_COLORS = {
+    'high_priority': '#ffcccb',    # Light red
+    'medium_priority': '#fff2cc',  # Light yellow
+    'low_priority': '#cce5ff'      # Light blue
+}
+
 # Improved CSS for better readability
 st.markdown("""
 <style>
@@ -98,6 +111,11 @@ def get_app_config():
     return load_config()
 
 config = get_app_config()
+# Load the spaCy model in the background while the user picks files
+preload_spacy_model()
+# Analyses already run side by side on the worker pool, so each rapidfuzz
+# batch stays on its own thread instead of starting one per core
+set_fuzzy_workers(1)
 audio_config = config.get('audio', {})
 security_config = config.get('security', {})
 
@@ -108,6 +126,55 @@ def init_database():
 
 db = init_database()
 
+# Analysis results keyed by transcript (and call type), so reruns that see the
+# same transcript again (e.g. Test Mode) skip the analysers. Scoring thresholds
+# come from config.yaml, which is itself cached above. The NLP wrappers raise
+# on failure, so fallback results are never cached and the next run retries.
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_sentiment(transcript: str) -> str:
+    return get_sentiment(transcript)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_customer_sentiment(transcript: str) -> Dict[str, Any]:
+    return get_customer_sentiment_analysis(transcript)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_keywords(transcript: str) -> List[Dict[str, Any]]:
+    return find_keywords_enhanced(transcript)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_rule_scores(transcript: str, call_type: str) -> Dict[str, Dict[str, Any]]:
+    return score_call_rule_based(transcript, call_type)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_nlp_scores(transcript: str, call_type: str) -> Dict[str, Dict[str, Any]]:
+    return score_call_nlp_enhanced(transcript, call_type, fallback=False)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_nlp_insights(transcript: str) -> Dict[str, Any]:
+    return extract_nlp_insights(transcript, fallback=False)
+
+def run_nlp_analyses(transcript: str, call_type: str, with_insights: bool):
+    """
+    All spaCy work for one transcript, in sequence on a single worker: the
+    shared pipeline's Vocab is written to while parsing, so two parses must
+    not run at the same time
+    """
+    try:
+        qa_results_nlp = cached_nlp_scores(transcript, call_type)
+    except Exception as e:
+        logger.warning(f"NLP analysis failed, falling back to rule-based: {e}")
+        qa_results_nlp = cached_rule_scores(transcript, call_type)
+    
+    insights = None
+    if with_insights:
+        try:
+            insights = cached_nlp_insights(transcript)
+        except Exception as e:
+            logger.warning(f"Could not extract NLP insights: {e}")
+            insights = empty_nlp_insights()
+    return qa_results_nlp, insights
+
 # Sidebar controls
 st.sidebar.title("⚙️ Configuration")
 
@@ -146,6 +213,11 @@ model_size = st.sidebar.selectbox(
     help="Larger models are more accurate but slower"
 )
 
+# Loaded models stay cached per size; free them when switching sizes
+if st.sidebar.button("♻️ Unload Whisper models", help="Free memory held by previously loaded model sizes"):
+    unload_models()
+    st.sidebar.success("Whisper models unloaded")
+
 call_type = st.sidebar.selectbox(
     "Call Type", 
     ["Customer Service", "Collections", "Sales", "Support"],
@@ -256,6 +328,42 @@ if agent_name.strip():
     except Exception as e:
         logger.error(f"Error loading agent history: {e}")
 
+def render_stored_analysis(call: Dict[str, Any]):
+    """Show the results kept in session state for a file that is not re-analysed"""
+    st.markdown(
+        '<div class="info-box">ℹ️ This recording has already been analysed in this session with the same settings - showing the stored results.</div>',
+        unsafe_allow_html=True
+    )
+    
+    st.subheader("📝 Transcript")
+    st.markdown(html.escape(call["transcript"]), unsafe_allow_html=True)
+    
+    st.markdown(f"**😊 Overall Call Sentiment:** {call['sentiment']}")
+    if call.get("customer_sentiment"):
+        st.markdown(
+            f"**🗣️ Customer Sentiment:** {call['customer_sentiment'].title()} "
+            f"(confidence: {call.get('customer_sentiment_confidence', 0.0):.2f})"
+        )
+    
+    if call["keywords"]:
+        st.markdown(f"**🔍 Detected Keywords:** {', '.join(call['keywords'])}")
+    else:
+        st.markdown("**✅ No significant keywords detected.**")
+    
+    st.subheader("📊 QA Scoring Analysis")
+    col1, col2 = st.columns(2)
+    for column, heading, results in (
+        (col1, "#### 🔍 Rule-Based Scoring", call["qa_results"]),
+        (col2, "#### 🧠 NLP-Enhanced Scoring", call["qa_results_nlp"])
+    ):
+        with column:
+            st.markdown(heading)
+            for section, result in results.items():
+                emoji = "✅" if result["score"] >= 1 else "❌"
+                st.markdown(f"- {emoji} **{section}**: {result['explanation']}")
+            total = sum(result["score"] for result in results.values())
+            st.markdown(f"**🏁 Total: {total}/{len(results)}**")
+
 # Processing section
 if uploaded_files:
     
@@ -285,303 +393,349 @@ if uploaded_files:
         with st.spinner(f"Loading {model_size} Whisper model..."):
             set_model_size(model_size)
         
-        # Process each file
-        for i, uploaded_file in enumerate(uploaded_files, start=1):
-            progress = (i - 1) / len(uploaded_files)
-            progress_bar.progress(progress)
-            status_text.text(f"Processing file {i} of {len(uploaded_files)}: {uploaded_file.name}")
+        # Files already analysed this session, by content hash and every setting
+        # that changes the transcript, the scores or the saved database record,
+        # so reruns and repeated uploads are not transcribed and saved a second
+        # time; changing any of them processes and saves the file again
+        processed_calls = {call.get("analysis_key"): call for call in st.session_state["summary_pdfs"]}
+        
+        # Per-transcript analyses are independent, so they overlap on worker
+        # threads (attached to this script run for Streamlit's caches); all
+        # rendering stays on the script thread. The with block shuts the pool
+        # down even when a rerun or stop interrupts the loop
+        with ThreadPoolExecutor(
+            max_workers=max_workers,
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx())
+        ) as analysis_pool:
+            # Process each file
+            for i, uploaded_file in enumerate(uploaded_files, start=1):
+                progress = (i - 1) / len(uploaded_files)
+                progress_bar.progress(progress)
+                status_text.text(f"Processing file {i} of {len(uploaded_files)}: {uploaded_file.name}")
             
-            # Create expandable section for each file
-            with st.expander(f"📁 {uploaded_file.name}", expanded=True):
+                # Create expandable section for each file
+                with st.expander(f"📁 {uploaded_file.name}", expanded=True):
+                
+                    file_hash = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+                    analysis_key = (file_hash, model_size, call_type, agent_name, call_date, department, enable_pii_redaction)
+                    if analysis_key in processed_calls:
+                        render_stored_analysis(processed_calls[analysis_key])
+                        continue
                 
-                # Save audio file locally
-                save_path = os.path.join("audio_samples", uploaded_file.name)
-                try:
-                    with open(save_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    st.session_state["temp_files"].append(save_path)
+                    # Save audio file locally
+                    save_path = os.path.join("audio_samples", uploaded_file.name)
+                    file_futures = []
+                    try:
+                        with open(save_path, "wb") as f:
+                            f.write(uploaded_file.getbuffer())
+                        st.session_state["temp_files"].append(save_path)
                     
-                    # Validate audio file
-                    validation = validate_audio_file(save_path)
+                        # Validate audio file
+                        validation = validate_audio_file(save_path, keep_audio=True)
                     
-                    if not validation['valid']:
-                        st.markdown(
-                            f'<div class="error-box">❌ <strong>File Validation Failed:</strong><br>{"<br>".join(validation["errors"])}</div>',
-                            unsafe_allow_html=True
-                        )
-                        continue
+                        if not validation['valid']:
+                            st.markdown(
+                                f'<div class="error-box">❌ <strong>File Validation Failed:</strong><br>{"<br>".join(validation["errors"])}</div>',
+                                unsafe_allow_html=True
+                            )
+                            continue
                     
-                    # Show warnings if any
-                    if validation['warnings']:
-                        st.markdown(
-                            f'<div class="warning-box">⚠️ <strong>Warnings:</strong><br>{"<br>".join(validation["warnings"])}</div>',
-                            unsafe_allow_html=True
-                        )
+                        # Show warnings if any
+                        if validation['warnings']:
+                            st.markdown(
+                                f'<div class="warning-box">⚠️ <strong>Warnings:</strong><br>{"<br>".join(validation["warnings"])}</div>',
+                                unsafe_allow_html=True
+                            )
                     
-                    # Show file metadata
-                    if show_debug_info and validation['metadata']:
-                        metadata = validation['metadata']
-                        st.markdown(
-                            f'<div class="info-box">📊 <strong>File Metadata:</strong><br>'
-                            f'Duration: {metadata.get("duration_minutes", 0):.1f} minutes | '
-                            f'Sample Rate: {metadata.get("sample_rate", 0)} Hz | '
-                            f'Channels: {metadata.get("channels", 0)}</div>',
-                            unsafe_allow_html=True
-                        )
+                        # Show file metadata
+                        if show_debug_info and validation['metadata']:
+                            metadata = validation['metadata']
+                            st.markdown(
+                                f'<div class="info-box">📊 <strong>File Metadata:</strong><br>'
+                                f'Duration: {metadata.get("duration_minutes", 0):.1f} minutes | '
+                                f'Sample Rate: {metadata.get("sample_rate", 0)} Hz | '
+                                f'Channels: {metadata.get("channels", 0)}</div>',
+                                unsafe_allow_html=True
+                            )
                     
-                    # Transcription
-                    transcription_start = time.time()
-                    with st.spinner("🎙️ Transcribing audio..."):
-                        transcript = transcribe_audio(save_path)
+                        # Transcription
+                        transcription_start = time.time()
+                        with st.spinner("🎙️ Transcribing audio..."):
+                            transcript = transcribe_audio(save_path, validation=validation)
+                        # Release the decoded audio; only the metadata is kept with the results
+                        validation.pop('audio', None)
                     
-                    transcription_time = time.time() - transcription_start
-                    durations.append(transcription_time)
+                        transcription_time = time.time() - transcription_start
+                        durations.append(transcription_time)
+                    
+                        # Check for transcription errors
+                        if transcript.startswith("[ERROR]"):
+                            st.markdown(
+                                f'<div class="error-box">❌ <strong>Transcription Failed:</strong><br>{transcript}</div>',
+                                unsafe_allow_html=True
+                            )
+                            continue
                     
-                    # Check for transcription errors
-                    if transcript.startswith("[ERROR]"):
                         st.markdown(
-                            f'<div class="error-box">❌ <strong>Transcription Failed:</strong><br>{transcript}</div>',
+                            f'<div class="success-box">✅ <strong>Transcription Completed Successfully</strong><br>Processing time: {transcription_time:.1f} seconds</div>',
                             unsafe_allow_html=True
                         )
-                        continue
-                    
-                    st.markdown(
-                        f'<div class="success-box">✅ <strong>Transcription Completed Successfully</strong><br>Processing time: {transcription_time:.1f} seconds</div>',
-                        unsafe_allow_html=True
-                    )
                     
-                    # Show ETA for remaining files
-                    if len(durations) > 0 and i < len(uploaded_files):
-                        eta = np.mean(durations) * (len(uploaded_files) - i)
-                        status_text.text(f"⏳ Estimated time remaining: {eta:.0f} seconds")
+                        # Show ETA for remaining files
+                        if len(durations) > 0 and i < len(uploaded_files):
+                            eta = np.mean(durations) * (len(uploaded_files) - i)
+                            status_text.text(f"⏳ Estimated time remaining: {eta:.0f} seconds")
                     
-                    # Apply PII redaction if enabled
-                    if enable_pii_redaction:
-                        transcript = redact_pii(transcript)
+                        # Apply PII redaction if enabled
+                        if enable_pii_redaction:
+                            transcript = redact_pii(transcript)
                     
-                    # Enhanced keyword detection
-                    with st.spinner("🔍 Analyzing keywords..."):
-                        keyword_matches = find_keywords_enhanced(transcript)
+                        # Start every analysis of the transcript, then collect each result where it is displayed
+                        keywords_future = analysis_pool.submit(cached_keywords, transcript)
+                        sentiment_future = analysis_pool.submit(cached_sentiment, transcript)
+                        customer_sentiment_future = analysis_pool.submit(cached_customer_sentiment, transcript)
+                        qa_rule_future = analysis_pool.submit(cached_rule_scores, transcript, call_type)
+                        nlp_future = analysis_pool.submit(run_nlp_analyses, transcript, call_type, show_debug_info)
+                        file_futures = [keywords_future, sentiment_future, customer_sentiment_future, qa_rule_future, nlp_future]
                     
-                    # Highlight keywords in transcript
-                    highlighted = transcript
-                    offset = 0
+                        # Enhanced keyword detection
+                        with st.spinner("🔍 Analyzing keywords..."):
+                            keyword_matches = keywords_future.result()
                     
-                    # Sort matches by position to avoid offset issues
-                    keyword_matches_sorted = sorted(keyword_matches, key=lambda x: x["start"])
+                        # Highlight keywords in transcript: walk the matches in position
+                        # order and build the HTML from fragments in a single pass
+                        parts = []
+                        cursor = 0
                     
-                    for match in keyword_matches_sorted:
-                        start = match["start"] + offset
-                        end = match["end"] + offset
-                        phrase = highlighted[start:end]
+                        for match in sorted(keyword_matches, key=lambda x: x["start"]):
+                            start = match["start"]
+                            end = match["end"]
+                            if start < cursor:
+                                continue  # Overlaps the previous highlight
+                            phrase = html.escape(transcript[start:end])
                         
-                        # Color code by priority - improved colors for better readability
-                        color = {
-                            'high_priority': '#ffcccb',    # Light red
-                            'medium_priority': '#fff2cc',  # Light yellow
-                            'low_priority': '#cce5ff'      # Light blue
-                        }.get(match.get('priority', 'medium_priority'), '#fff2cc')
+                            # Color code by priority
+                            color = HIGHLIGHT_COLORS.get(match.get('priority', 'medium_priority'), '#fff2cc')
                         
-                        confidence = match.get('confidence', 0)
-                        title = f"Confidence: {confidence:.2f}, Priority: {match.get('priority', 'medium')}"
+                            confidence = match.get('confidence', 0)
+                            title = f"Confidence: {confidence:.2f}, Priority: {match.get('priority', 'medium')}"
                         
-                        highlight_html = f'<mark style="background-color: {color}; border-radius: 3px; padding: 2px; color: #333;" title="{title}">{phrase}</mark>'
-                        highlighted = highlighted[:start] + highlight_html + highlighted[end:]
-                        offset += len(highlight_html) - len(phrase)
+                            parts.append(html.escape(transcript[cursor:start]))
+                            parts.append(f'<mark style="background-color: {color}; border-radius: 3px; padding: 2px; color: #333;" title="{title}">{phrase}</mark>')
+                            cursor = end
                     
-                    # Display transcript with highlights
-                    st.subheader("📝 Transcript with Highlighted Keywords")
-                    st.markdown(highlighted, unsafe_allow_html=True)
+                        parts.append(html.escape(transcript[cursor:]))
+                        highlighted = "".join(parts)
                     
-                    # Sentiment analysis
-                    sentiment = get_sentiment(transcript)
-                    customer_sentiment_analysis = get_customer_sentiment_analysis(transcript)
-                    customer_sentiment = customer_sentiment_analysis.get('customer_sentiment', 'unknown')
-                    customer_sentiment_confidence = customer_sentiment_analysis.get('confidence', 0.0)
-                    customer_text_sample = customer_sentiment_analysis.get('customer_text_sample', '')
-
-                    sentiment_color = {
-                        'Positive': '#28a745',
-                        'Negative': '#dc3545', 
-                        'Neutral': '#6c757d'
-                    }.get(sentiment, '#6c757d')
-                    customer_sentiment_label = customer_sentiment.title() if customer_sentiment else 'Unknown'
-                    customer_sentiment_color = {
-                        'positive': '#28a745',
-                        'negative': '#dc3545',
-                        'neutral': '#6c757d',
-                        'unknown': '#6c757d'
-                    }.get(customer_sentiment, '#6c757d')
-
-                    sentiment_col1, sentiment_col2 = st.columns(2)
-                    with sentiment_col1:
-                        st.markdown(
-                            f"**😊 Overall Call Sentiment:** <span style='color: {sentiment_color}; font-weight: bold;'>{sentiment}</span>",
-                            unsafe_allow_html=True
-                        )
-                    with sentiment_col2:
-                        st.markdown(
-                            f"**🗣️ Customer Sentiment:** <span style='color: {customer_sentiment_color}; font-weight: bold;'>{customer_sentiment_label}</span> "
-                            f"<span style='color: #6c757d;'>(confidence: {customer_sentiment_confidence:.2f})</span>",
-                            unsafe_allow_html=True
-                        )
+                        # Display transcript with highlights
+                        st.subheader("📝 Transcript with Highlighted Keywords")
+                        st.markdown(highlighted, unsafe_allow_html=True)
+                    
+                        # Sentiment analysis
+                        sentiment = sentiment_future.result()
+                        customer_sentiment_analysis = customer_sentiment_future.result()
+                        customer_sentiment = customer_sentiment_analysis.get('customer_sentiment', 'unknown')
+                        customer_sentiment_confidence = customer_sentiment_analysis.get('confidence', 0.0)
+                        customer_text_sample = customer_sentiment_analysis.get('customer_text_sample', '')
+
+                        sentiment_color = {
+                            'Positive': '#28a745',
+                            'Negative': '#dc3545', 
+                            'Neutral': '#6c757d'
+                        }.get(sentiment, '#6c757d')
+                        customer_sentiment_label = customer_sentiment.title() if customer_sentiment else 'Unknown'
+                        customer_sentiment_color = {
+                            'positive': '#28a745',
+                            'negative': '#dc3545',
+                            'neutral': '#6c757d',
+                            'unknown': '#6c757d'
+                        }.get(customer_sentiment, '#6c757d')
+
+                        sentiment_col1, sentiment_col2 = st.columns(2)
+                        with sentiment_col1:
+                            st.markdown(
+                                f"**😊 Overall Call Sentiment:** <span style='color: {sentiment_color}; font-weight: bold;'>{sentiment}</span>",
+                                unsafe_allow_html=True
+                            )
+                        with sentiment_col2:
+                            st.markdown(
+                                f"**🗣️ Customer Sentiment:** <span style='color: {customer_sentiment_color}; font-weight: bold;'>{customer_sentiment_label}</span> "
+                                f"<span style='color: #6c757d;'>(confidence: {customer_sentiment_confidence:.2f})</span>",
+                                unsafe_allow_html=True
+                            )
                     
-                    # Enhanced keywords display
-                    if keyword_matches:
-                        st.subheader("🔍 Detected Keywords")
+                        # Enhanced keywords display
+                        if keyword_matches:
+                            st.subheader("🔍 Detected Keywords")
                         
-                        # Group by priority
-                        keywords_by_priority = {}
-                        for match in keyword_matches:
-                            priority = match.get('priority', 'medium_priority')
-                            if priority not in keywords_by_priority:
-                                keywords_by_priority[priority] = []
-                            keywords_by_priority[priority].append(match)
+                            # Group by priority
+                            keywords_by_priority = {}
+                            for match in keyword_matches:
+                                priority = match.get('priority', 'medium_priority')
+                                if priority not in keywords_by_priority:
+                                    keywords_by_priority[priority] = []
+                                keywords_by_priority[priority].append(match)
                         
-                        for priority in ['high_priority', 'medium_priority', 'low_priority']:
-                            if priority in keywords_by_priority:
-                                priority_label = priority.replace('_', ' ').title()
-                                color = {
-                                    'high_priority': '#dc3545',
-                                    'medium_priority': '#fd7e14',
-                                    'low_priority': '#0d6efd'
-                                }.get(priority, '#6c757d')
+                            for priority in ['high_priority', 'medium_priority', 'low_priority']:
+                                if priority in keywords_by_priority:
+                                    priority_label = priority.replace('_', ' ').title()
+                                    color = {
+                                        'high_priority': '#dc3545',
+                                        'medium_priority': '#fd7e14',
+                                        'low_priority': '#0d6efd'
+                                    }.get(priority, '#6c757d')
                                 
-                                st.markdown(f"**<span style='color: {color}'>{priority_label}</span>:**", 
-                                           unsafe_allow_html=True)
+                                    st.markdown(f"**<span style='color: {color}'>{priority_label}</span>:**", 
+                                               unsafe_allow_html=True)
                                 
-                                for match in keywords_by_priority[priority]:
-                                    confidence = match.get('confidence', 0)
-                                    match_type = match.get('match_type', 'exact')
-                                    st.markdown(f"- **{match['phrase']}** (confidence: {confidence:.2f}, {match_type} match)")
-                    else:
-                        st.markdown("**✅ No significant keywords detected.**")
+                                    for match in keywords_by_priority[priority]:
+                                        confidence = match.get('confidence', 0)
+                                        match_type = match.get('match_type', 'exact')
+                                        st.markdown(f"- **{match['phrase']}** (confidence: {confidence:.2f}, {match_type} match)")
+                        else:
+                            st.markdown("**✅ No significant keywords detected.**")
                     
-                    # QA Scoring
-                    st.subheader("📊 QA Scoring Analysis")
+                        # QA Scoring
+                        st.subheader("📊 QA Scoring Analysis")
                     
-                    # Rule-based scoring
-                    with st.spinner("Calculating rule-based scores..."):
-                        qa_results = score_call_rule_based(transcript, call_type)
+                        # Rule-based scoring
+                        with st.spinner("Calculating rule-based scores..."):
+                            qa_results = qa_rule_future.result()
                     
-                    # NLP-enhanced scoring
-                    with st.spinner("Performing NLP analysis..."):
-                        qa_results_nlp = score_call_nlp_enhanced(transcript, call_type)
+                        # NLP-enhanced scoring
+                        with st.spinner("Performing NLP analysis..."):
+                            qa_results_nlp, insights = nlp_future.result()
                     
-                    # Display scoring results
-                    col1, col2 = st.columns(2)
+                        # Display scoring results
+                        col1, col2 = st.columns(2)
                     
-                    with col1:
-                        st.markdown("#### 🔍 Rule-Based Scoring")
-                        rule_total = 0
-                        for section, result in qa_results.items():
-                            emoji = "✅" if result["score"] >= 1 else "❌"
-                            confidence = result.get('confidence', 0)
-                            st.markdown(f"- {emoji} **{section}**: {result['explanation']}")
-                            if show_debug_info:
-                                st.markdown(f"  *Confidence: {confidence:.2f}*")
-                            rule_total += result['score']
+                        with col1:
+                            st.markdown("#### 🔍 Rule-Based Scoring")
+                            rule_total = 0
+                            for section, result in qa_results.items():
+                                emoji = "✅" if result["score"] >= 1 else "❌"
+                                confidence = result.get('confidence', 0)
+                                st.markdown(f"- {emoji} **{section}**: {result['explanation']}")
+                                if show_debug_info:
+                                    st.markdown(f"  *Confidence: {confidence:.2f}*")
+                                rule_total += result['score']
                         
-                        st.markdown(f"**🏁 Total Rule-Based Score: {rule_total}/{len(qa_results)}**")
+                            st.markdown(f"**🏁 Total Rule-Based Score: {rule_total}/{len(qa_results)}**")
                     
-                    with col2:
-                        st.markdown("#### 🧠 NLP-Enhanced Scoring")
-                        nlp_total = 0
-                        for section, result in qa_results_nlp.items():
-                            emoji = "✅" if result["score"] >= 1 else "❌"
-                            confidence = result.get('confidence', 0)
-                            st.markdown(f"- {emoji} **{section}**: {result['explanation']}")
-                            if show_debug_info:
-                                st.markdown(f"  *Confidence: {confidence:.2f}*")
-                            nlp_total += result['score']
+                        with col2:
+                            st.markdown("#### 🧠 NLP-Enhanced Scoring")
+                            nlp_total = 0
+                            for section, result in qa_results_nlp.items():
+                                emoji = "✅" if result["score"] >= 1 else "❌"
+                                confidence = result.get('confidence', 0)
+                                st.markdown(f"- {emoji} **{section}**: {result['explanation']}")
+                                if show_debug_info:
+                                    st.markdown(f"  *Confidence: {confidence:.2f}*")
+                                nlp_total += result['score']
                         
-                        st.markdown(f"**🏁 Total NLP Score: {nlp_total}/{len(qa_results_nlp)}**")
+                            st.markdown(f"**🏁 Total NLP Score: {nlp_total}/{len(qa_results_nlp)}**")
                     
-                    # NLP Insights (if debug mode is enabled)
-                    if show_debug_info:
-                        st.subheader("🔬 Advanced NLP Insights")  # ← CHANGED THIS LINE
-                        insights = extract_nlp_insights(transcript)
+                        # NLP Insights (if debug mode is enabled)
+                        if show_debug_info:
+                            st.subheader("🔬 Advanced NLP Insights")  # ← CHANGED THIS LINE
     
-                        if insights['entities']:
-                            st.markdown("**Named Entities:**")
-                            for entity in insights['entities'][:10]:  # Limit to first 10
-                                st.markdown(f"- {entity['text']} ({entity['label']})")
+                            if insights['entities']:
+                                st.markdown("**Named Entities:**")
+                                for entity in insights['entities'][:10]:  # Limit to first 10
+                                    st.markdown(f"- {entity['text']} ({entity['label']})")
     
-                        if insights['emotional_indicators']:
-                            st.markdown("**Emotional Indicators:**")
-                            for indicator in insights['emotional_indicators'][:5]:  # Limit to first 5
-                                st.markdown(f"- {indicator['word']}: {indicator['context']}")
+                            if insights['emotional_indicators']:
+                                st.markdown("**Emotional Indicators:**")
+                                for indicator in insights['emotional_indicators'][:5]:  # Limit to first 5
+                                    st.markdown(f"- {indicator['word']}: {indicator['context']}")
     
-                        st.markdown(f"**Text Complexity Score:** {insights['complexity_score']:.2f}")
+                            st.markdown(f"**Text Complexity Score:** {insights['complexity_score']:.2f}")
                     
-                    # NEW: Save to Database
-                    if agent_name.strip():  # Only save if agent name is provided
-                        try:
-                            # Prepare enhanced call data
-                            call_data = {
-                                "filename": uploaded_file.name,
-                                "call_date": call_date,
-                                "call_type": call_type,
-                                "department": department,
-                                "transcript": transcript,
-                                "sentiment": sentiment,
-                                "customer_sentiment": customer_sentiment,
-                                "customer_sentiment_confidence": customer_sentiment_confidence,
-                                "customer_text_sample": customer_text_sample,
-                                "keywords": [match["phrase"] for match in keyword_matches],
-                                "keywords_enhanced": keyword_matches,
-                                "qa_results": qa_results,
-                                "qa_results_nlp": qa_results_nlp,
-                                "processing_time": transcription_time,
-                                "metadata": validation.get('metadata', {})
-                            }
+                        # NEW: Save to Database
+                        if agent_name.strip():  # Only save if agent name is provided
+                            try:
+                                # Prepare enhanced call data
+                                call_data = {
+                                    "filename": uploaded_file.name,
+                                    "call_date": call_date,
+                                    "call_type": call_type,
+                                    "department": department,
+                                    "transcript": transcript,
+                                    "sentiment": sentiment,
+                                    "customer_sentiment": customer_sentiment,
+                                    "customer_sentiment_confidence": customer_sentiment_confidence,
+                                    "customer_text_sample": customer_text_sample,
+                                    "keywords": [match["phrase"] for match in keyword_matches],
+                                    "keywords_enhanced": keyword_matches,
+                                    "qa_results": qa_results,
+                                    "qa_results_nlp": qa_results_nlp,
+                                    "processing_time": transcription_time,
+                                    "metadata": validation.get('metadata', {}),
+                                    "file_hash": file_hash,
+                                    "analysis_key": analysis_key
+                                }
         
-                            # Save to database
-                            call_id = db.save_call_analysis(agent_name, call_data)
-                            st.success(f"✅ Call analysis saved to database (ID: {call_id})")
+                                # Save to database
+                                call_id = db.save_call_analysis(agent_name, call_data)
+                                st.success(f"✅ Call analysis saved to database (ID: {call_id})")
         
-                            # Also keep the existing session state for PDF generation
-                            st.session_state["summary_pdfs"].append(call_data)
+                                # Also keep the existing session state for PDF generation
+                                st.session_state["summary_pdfs"].append(call_data)
         
-                        except Exception as e:
-                            st.error(f"❌ Failed to save to database: {str(e)}")
-                            logger.error(f"Database save error: {e}")
+                            except Exception as e:
+                                st.error(f"❌ Failed to save to database: {str(e)}")
+                                logger.error(f"Database save error: {e}")
         
-                            # Still append to session state for PDF generation
+                                # Still append to session state for PDF generation
+                                st.session_state["summary_pdfs"].append({
+                                    "filename": uploaded_file.name,
+                                    "transcript": transcript,
+                                    "sentiment": sentiment,
+                                    "customer_sentiment": customer_sentiment,
+                                    "customer_sentiment_confidence": customer_sentiment_confidence,
+                                    "customer_text_sample": customer_text_sample,
+                                    "keywords": [match["phrase"] for match in keyword_matches],
+                                    "qa_results": qa_results,
+                                    "qa_results_nlp": qa_results_nlp,
+                                    "processing_time": transcription_time,
+                                    "metadata": validation.get('metadata', {}),
+                                    "file_hash": file_hash,
+                                    "analysis_key": analysis_key
+                                })
+                        else:
+                            st.warning("⚠️ Agent name not provided - call will not be saved to database")
+    
+                            # Still append to session state for immediate PDF generation
                             st.session_state["summary_pdfs"].append({
                                 "filename": uploaded_file.name,
                                 "transcript": transcript,
                                 "sentiment": sentiment,
-                                "customer_sentiment": customer_sentiment,
-                                "customer_sentiment_confidence": customer_sentiment_confidence,
-                                "customer_text_sample": customer_text_sample,
                                 "keywords": [match["phrase"] for match in keyword_matches],
                                 "qa_results": qa_results,
                                 "qa_results_nlp": qa_results_nlp,
                                 "processing_time": transcription_time,
-                                "metadata": validation.get('metadata', {})
+                                "metadata": validation.get('metadata', {}),
+                                "file_hash": file_hash,
+                                "analysis_key": analysis_key
                             })
-                    else:
-                        st.warning("⚠️ Agent name not provided - call will not be saved to database")
-    
-                        # Still append to session state for immediate PDF generation
-                        st.session_state["summary_pdfs"].append({
-                            "filename": uploaded_file.name,
-                            "transcript": transcript,
-                            "sentiment": sentiment,
-                            "keywords": [match["phrase"] for match in keyword_matches],
-                            "qa_results": qa_results,
-                            "qa_results_nlp": qa_results_nlp,
-                            "processing_time": transcription_time,
-                            "metadata": validation.get('metadata', {})
-                        })
                     
-                except Exception as e:
-                    logger.error(f"Error processing {uploaded_file.name}: {e}")
-                    st.markdown(
-                        f'<div class="error-box">❌ <strong>Processing Error:</strong><br>{str(e)}</div>',
-                        unsafe_allow_html=True
-                    )
+                        processed_calls[analysis_key] = st.session_state["summary_pdfs"][-1]
+                    
+                    except Exception as e:
+                        logger.error(f"Error processing {uploaded_file.name}: {e}")
+                        st.markdown(
+                            f'<div class="error-box">❌ <strong>Processing Error:</strong><br>{str(e)}</div>',
+                            unsafe_allow_html=True
+                        )
+                    
+                    finally:
+                        # If this file failed part-way, drop its queued analyses and wait
+                        # for any still running, so its spaCy task cannot overlap the
+                        # next file's
+                        for future in file_futures:
+                            future.cancel()
+                        wait(file_futures)
         
         # Complete processing
         progress_bar.progress(1.0)
@@ -676,15 +830,15 @@ if st.sidebar.checkbox("🧪 Test Mode"):
             test_transcript = redact_pii(sample_transcript) if enable_pii_redaction else sample_transcript
             
             # Sentiment analysis
-            sentiment = get_sentiment(test_transcript)
-            customer_sentiment_analysis = get_customer_sentiment_analysis(test_transcript)
+            sentiment = cached_sentiment(test_transcript)
+            customer_sentiment_analysis = cached_customer_sentiment(test_transcript)
             customer_sentiment = customer_sentiment_analysis.get('customer_sentiment', 'unknown')
             customer_sentiment_confidence = customer_sentiment_analysis.get('confidence', 0.0)
             st.markdown(f"**😊 Overall Call Sentiment:** {sentiment}")
             st.markdown(f"**🗣️ Customer Sentiment:** {customer_sentiment.title()} (confidence: {customer_sentiment_confidence:.2f})")
             
             # Enhanced keyword detection
-            keywords_found = find_keywords_enhanced(test_transcript)
+            keywords_found = cached_keywords(test_transcript)
             
             if keywords_found:
                 st.markdown("**🔍 Keywords Detected:**")
@@ -700,7 +854,7 @@ if st.sidebar.checkbox("🧪 Test Mode"):
             
             with col1:
                 st.markdown("#### 🔍 Rule-Based Test Results")
-                qa_results = score_call_rule_based(test_transcript, call_type)
+                qa_results = cached_rule_scores(test_transcript, call_type)
                 rule_total = 0
                 for section, result in qa_results.items():
                     emoji = "✅" if result["score"] >= 1 else "❌"
@@ -713,7 +867,8 @@ if st.sidebar.checkbox("🧪 Test Mode"):
             
             with col2:
                 st.markdown("#### 🧠 NLP-Enhanced Test Results")
-                qa_results_nlp = score_call_nlp_enhanced(test_transcript, call_type)
+                # Same fallback as file processing: an NLP failure falls back to rule-based scores
+                qa_results_nlp, insights = run_nlp_analyses(test_transcript, call_type, show_debug_info)
                 nlp_total = 0
                 for section, result in qa_results_nlp.items():
                     emoji = "✅" if result["score"] >= 1 else "❌"
@@ -727,7 +882,6 @@ if st.sidebar.checkbox("🧪 Test Mode"):
             # Advanced insights in test mode
             if show_debug_info:
                 st.subheader("🔬 Test NLP Insights")
-                insights = extract_nlp_insights(test_transcript)
                 st.json(insights)
 
 # Footer with system information
@@ -1,5 +1,7 @@
 import sqlite3
-from analyser import analyzer
+from customer_sentiment import get_analyzer
+
+analyzer = get_analyzer()
 
 conn = sqlite3.connect('call_analysis.db')
 cursor = conn.cursor()
@@ -1,5 +1,7 @@
 import sqlite3
-from analyser import analyzer
+from customer_sentiment import get_analyzer
+
+analyzer = get_analyzer()
 
 # Connect to database
 conn = sqlite3.connect('call_analysis.db')
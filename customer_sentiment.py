@@ -1,6 +1,7 @@
 import sqlite3
 import re
 from typing import Dict, Tuple, List
+from functools import lru_cache
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 # Optional transformer-based sentiment (better for some cases)
@@ -13,7 +14,18 @@ except Exception:
 
 _TRANSFORMER_PIPE = None
 
-analyzer = SentimentIntensityAnalyzer()
+# Optional single-pass phrase matching for speaker detection
+try:
+    import ahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    _AHOCORASICK_AVAILABLE = False
+
+@lru_cache(maxsize=1)
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    """Shared VADER instance, built on first use so the lexicon is only parsed by processes that score sentiment"""
+    return SentimentIntensityAnalyzer()
 
 # Speaker label detection
 CUSTOMER_LABEL_RE = re.compile(r'^\s*(?:customer|cust|c|caller|client)[:\-\]\)]\s*(.*)$', re.IGNORECASE)
@@ -196,6 +208,48 @@ CUSTOMER_PATTERNS = [
 
 SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
 
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+def _build_pattern_matcher(patterns: List[str]):
+    """
+    Split a pattern list into plain phrases, matched together by one Aho-Corasick
+    automaton (phrase -> how many list entries it covers), and true regexes,
+    compiled once with IGNORECASE.
+    """
+    literal_counts = {}
+    regexes = []
+    for pattern in patterns:
+        if _AHOCORASICK_AVAILABLE and not REGEX_METACHARACTERS.intersection(pattern):
+            literal = pattern.lower()
+            literal_counts[literal] = literal_counts.get(literal, 0) + 1
+        else:
+            regexes.append(re.compile(pattern, re.IGNORECASE))
+
+    automaton = None
+    if literal_counts:
+        automaton = ahocorasick.Automaton()
+        for literal in literal_counts:
+            automaton.add_word(literal, literal)
+        automaton.make_automaton()
+    return automaton, literal_counts, regexes
+
+
+def _count_pattern_hits(text: str, matcher) -> int:
+    """Number of patterns in the list that occur anywhere in text"""
+    automaton, literal_counts, regexes = matcher
+    hits = 0
+    if automaton is not None:
+        found = {literal for _, literal in automaton.iter(text.lower())}
+        hits += sum(literal_counts[literal] for literal in found)
+    hits += sum(1 for regex in regexes if regex.search(text))
+    return hits
+
+
+# Built once; each segment is then scanned in a single pass per speaker
+AGENT_MATCHER = _build_pattern_matcher(AGENT_PATTERNS)
+CUSTOMER_MATCHER = _build_pattern_matcher(CUSTOMER_PATTERNS)
+
 # Thresholds
 SENTENCE_CONFIDENCE_THRESHOLD = 0.12   # per-sentence confidence below this is treated as low
 OVERALL_CONFIDENCE_THRESHOLD = 0.10    # final confidence below this -> 'unknown'
@@ -242,12 +296,11 @@ def extract_agent_from_labeled_transcript(transcript: str) -> str:
 def _score_segment(segment: str) -> Tuple[int, int]:
     """Score a segment for agent/customer likelihood using phrase matches."""
     cleaned = segment.strip()
-    lowered = cleaned.lower()
     if not cleaned:
         return 0, 0
 
-    agent_score = sum(1 for pattern in AGENT_PATTERNS if re.search(pattern, lowered))
-    customer_score = sum(1 for pattern in CUSTOMER_PATTERNS if re.search(pattern, lowered))
+    agent_score = _count_pattern_hits(cleaned, AGENT_MATCHER)
+    customer_score = _count_pattern_hits(cleaned, CUSTOMER_MATCHER)
 
     if AGENT_LABEL_RE.match(cleaned):
         agent_score += 3
@@ -356,12 +409,14 @@ def _get_transformer_pipeline():
             return None
     return _TRANSFORMER_PIPE
 
+@lru_cache(maxsize=4096)
 def _vader_sentence_score(sentence: str) -> Tuple[str, float]:
     """
     Return (label, confidence) for a sentence using VADER. 
     Uses the same logic as analyser.py get_sentiment() for consistency.
+    Cached: short replies ("Yes.", "Okay, thank you.") recur across every call.
     """
-    scores = analyzer.polarity_scores(sentence)
+    scores = get_analyzer().polarity_scores(sentence)
     pos_score = scores. get("pos", 0.0)
     neg_score = scores.get("neg", 0.0)
     net_sentiment = pos_score - neg_score
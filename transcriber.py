@@ -28,6 +28,9 @@ def reset_model():
         if model is not None:
             logger.info("Resetting corrupted Whisper model")
             del model
+            # Drop the cached instances too, otherwise the reload below would
+            # hand back the same corrupted model
+            load_whisper_model.clear()
             gc.collect()
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
@@ -55,12 +58,50 @@ def load_whisper_model(size: str):
         raise
 
 def set_model_size(size: str):
-    """Set the global Whisper model"""
+    """Set the global Whisper model (loaded once per size, then served from the resource cache)"""
     global model
     model = load_whisper_model(size)
 
-def validate_audio_file(file_path: str) -> Dict[str, Any]:
-    """Validate audio file and return metadata"""
+def use_half_precision(model_instance) -> bool:
+    """Whisper only supports fp16 on CUDA, where it halves weight memory and bandwidth"""
+    device = getattr(model_instance, 'device', None)
+    return getattr(device, 'type', 'cpu') == 'cuda'
+
+def unload_models():
+    """Release every cached Whisper model, e.g. after switching sizes"""
+    global model
+    with model_lock:
+        model = None
+        load_whisper_model.clear()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+def load_audio_segment(file_path: str) -> AudioSegment:
+    """Decode an audio file with pydub, picking the decoder from the file extension"""
+    file_extension = Path(file_path).suffix.lower().lstrip('.')
+    if file_extension == 'mp3':
+        audio = AudioSegment.from_mp3(file_path)
+    elif file_extension == 'wav':
+        audio = AudioSegment.from_wav(file_path)
+    elif file_extension == 'm4a':
+        audio = AudioSegment.from_file(file_path, format='m4a')
+    elif file_extension == 'flac':
+        audio = AudioSegment.from_file(file_path, format='flac')
+    elif file_extension == 'aac':
+        audio = AudioSegment.from_file(file_path, format='aac')
+    elif file_extension == 'ogg':
+        audio = AudioSegment.from_ogg(file_path)
+    else:
+        audio = AudioSegment.from_file(file_path)
+    return audio
+
+def validate_audio_file(file_path: str, keep_audio: bool = False) -> Dict[str, Any]:
+    """
+    Validate audio file and return metadata.
+    With keep_audio=True the decoded AudioSegment is returned under 'audio',
+    so transcription can reuse it instead of decoding the file again.
+    """
     config = load_config()
     audio_config = config.get('audio', {})
     supported_formats = audio_config.get('supported_formats', ['mp3', 'wav'])
@@ -93,20 +134,9 @@ def validate_audio_file(file_path: str) -> Dict[str, Any]:
     
     # Try to load audio file to check if it's valid
     try:
-        if file_extension == 'mp3':
-            audio = AudioSegment.from_mp3(file_path)
-        elif file_extension == 'wav':
-            audio = AudioSegment.from_wav(file_path)
-        elif file_extension == 'm4a':
-            audio = AudioSegment.from_file(file_path, format='m4a')
-        elif file_extension == 'flac':
-            audio = AudioSegment.from_file(file_path, format='flac')
-        elif file_extension == 'aac':
-            audio = AudioSegment.from_file(file_path, format='aac')
-        elif file_extension == 'ogg':
-            audio = AudioSegment.from_ogg(file_path)
-        else:
-            audio = AudioSegment.from_file(file_path)
+        audio = load_audio_segment(file_path)
+        if keep_audio:
+            validation_result['audio'] = audio
         
         # Extract metadata
         duration_seconds = len(audio) / 1000
@@ -162,8 +192,12 @@ def preprocess_audio(audio: AudioSegment, config: Dict[str, Any]) -> AudioSegmen
         logger.warning(f"Audio preprocessing failed, using original: {e}")
         return audio
 
-def convert_audio_format(file_path: str, target_format: str = 'wav') -> str:
-    """Convert audio file to target format with preprocessing"""
+def convert_audio_format(file_path: str, target_format: str = 'wav',
+                         audio: Optional[AudioSegment] = None) -> str:
+    """
+    Convert audio file to target format with preprocessing.
+    Pass audio (the file already decoded, e.g. by validate_audio_file) to skip decoding it again.
+    """
     config = load_config()
     file_extension = Path(file_path).suffix.lower().lstrip('.')
     
@@ -175,20 +209,8 @@ def convert_audio_format(file_path: str, target_format: str = 'wav') -> str:
         
     try:
         # Load audio file
-        if file_extension == 'mp3':
-            audio = AudioSegment.from_mp3(file_path)
-        elif file_extension == 'wav':
-            audio = AudioSegment.from_wav(file_path)
-        elif file_extension == 'm4a':
-            audio = AudioSegment.from_file(file_path, format='m4a')
-        elif file_extension == 'flac':
-            audio = AudioSegment.from_file(file_path, format='flac')
-        elif file_extension == 'aac':
-            audio = AudioSegment.from_file(file_path, format='aac')
-        elif file_extension == 'ogg':
-            audio = AudioSegment.from_ogg(file_path)
-        else:
-            audio = AudioSegment.from_file(file_path)
+        if audio is None:
+            audio = load_audio_segment(file_path)
         
         # Preprocess audio (includes automatic upsampling to 16kHz)
         audio = preprocess_audio(audio, config)
@@ -208,10 +230,12 @@ def convert_audio_format(file_path: str, target_format: str = 'wav') -> str:
         logger.error(f"Audio conversion failed: {e}")
         raise Exception(f"Failed to convert audio file: {str(e)}")
 
-def chunk_audio(file_path: str, chunk_duration_minutes: int = 10) -> List[str]:
-    """Split audio file into smaller chunks for processing"""
+def chunk_audio(file_path: str, chunk_duration_minutes: int = 10,
+                audio: Optional[AudioSegment] = None) -> List[str]:
+    """Split audio file into smaller chunks for processing (pass audio if file_path is already decoded)"""
     try:
-        audio = AudioSegment.from_file(file_path)
+        if audio is None:
+            audio = AudioSegment.from_file(file_path)
         chunk_duration_ms = chunk_duration_minutes * 60 * 1000
         
         chunks = []
@@ -296,8 +320,8 @@ def transcribe_chunk(chunk_path: str, model_instance) -> Dict[str, Any]:
             
             # NEW: Try transcription with multiple fallback strategies
             transcription_attempts = [
-                # Attempt 1: Standard parameters
-                {'fp16': False, 'verbose': False, 'language': None, 'task': 'transcribe'},
+                # Attempt 1: Standard parameters (half precision on GPU)
+                {'fp16': use_half_precision(model_instance), 'verbose': False, 'language': None, 'task': 'transcribe'},
                 # Attempt 2: Force English (sometimes helps with tensor issues)
                 {'fp16': False, 'verbose': False, 'language': 'en', 'task': 'transcribe'},
                 # Attempt 3: Minimal parameters
@@ -397,14 +421,15 @@ def transcribe_chunk(chunk_path: str, model_instance) -> Dict[str, Any]:
             'segments': []
         }
 
-def transcribe_audio_parallel(file_path: str, max_workers: int = 4) -> Dict[str, Any]:
-    """Transcribe audio using parallel processing with enhanced error handling"""
+def transcribe_audio_parallel(file_path: str, validation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Transcribe audio using parallel processing with enhanced error handling.
+    Pass validation from validate_audio_file(file_path, keep_audio=True) to reuse
+    its decoded audio instead of validating and decoding the file again.
+    """
     config = load_config()
     chunk_duration = config.get('audio', {}).get('chunk_duration_minutes', 5)  # Reduced default
     
-    # NEW: Force sequential processing for stability
-    max_workers = min(max_workers, 4)  # Allow up to 4 workers
-    
     # NEW: Check model health before starting
     global model
     if model is None:
@@ -417,8 +442,9 @@ def transcribe_audio_parallel(file_path: str, max_workers: int = 4) -> Dict[str,
         }    
     
     
-    # Validate audio file
-    validation = validate_audio_file(file_path)
+    # Validate audio file (decoded once here, then reused for conversion and chunking)
+    if validation is None or 'audio' not in validation:
+        validation = validate_audio_file(file_path, keep_audio=True)
     if not validation['valid']:
         return {
             'success': False,
@@ -429,6 +455,9 @@ def transcribe_audio_parallel(file_path: str, max_workers: int = 4) -> Dict[str,
     
     metadata = validation['metadata']
     warnings = validation['warnings']
+    # Take the decoded audio out of validation so this function holds the only
+    # reference and can release it before Whisper runs
+    audio = validation.pop('audio', None)
     
     # Determine if chunking is needed
     duration_minutes = metadata.get('duration_minutes', 0)
@@ -445,12 +474,15 @@ def transcribe_audio_parallel(file_path: str, max_workers: int = 4) -> Dict[str,
             is_temp_file = False
         else:
             # Convert non-MP3 files as before
-            processed_file = convert_audio_format(file_path, 'wav')
+            processed_file = convert_audio_format(file_path, 'wav', audio=audio)
             is_temp_file = processed_file != file_path
         
         if needs_chunking:
-            # Split into chunks
-            chunks = chunk_audio(processed_file, chunk_duration)
+            # Split into chunks; the converted file is preprocessed, so only
+            # the original decode can be reused
+            chunks = chunk_audio(processed_file, chunk_duration,
+                                 audio=audio if processed_file == file_path else None)
+            audio = None  # Chunks are on disk; free the decode before inference
             
             # Transcribe chunks sequentially for stability
             transcripts = []
@@ -489,35 +521,20 @@ def transcribe_audio_parallel(file_path: str, max_workers: int = 4) -> Dict[str,
                 except:
                     pass
             
-            max_workers = min(max_workers, 4)  # Cap at 4 workers for stability
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_chunk = {
-                    executor.submit(transcribe_chunk, chunk, model): chunk 
-                    for chunk in chunks
-                }
-                
-                for future in concurrent.futures.as_completed(future_to_chunk):
-                    chunk_path = future_to_chunk[future]
-                    try:
-                        result = future.result()
-                        if result['success']:
-                            transcripts.append(result['text'])
-                            all_segments.extend(result['segments'])
-                        else:
-                            transcripts.append(result['text'])  # Error message
-                    except Exception as e:
-                        transcripts.append(f'[ERROR] Chunk processing failed: {str(e)}')
-                    finally:
-                        # Clean up chunk file
-                        if os.path.exists(chunk_path):
-                            os.remove(chunk_path)
-            
             # Combine transcripts
             full_transcript = ' '.join(transcripts)
             
         else:
-            # Single file transcription
-            result = model.transcribe(processed_file, fp16=False)
+            audio = None  # Converted (or read directly); free the decode before inference
+            # Single file transcription, in half precision on GPU with an fp32 fallback
+            half_precision = use_half_precision(model)
+            try:
+                result = model.transcribe(processed_file, fp16=half_precision)
+            except Exception as fp16_error:
+                if not half_precision:
+                    raise
+                logger.warning(f"fp16 transcription failed, retrying in fp32: {fp16_error}")
+                result = model.transcribe(processed_file, fp16=False)
             full_transcript = result.get('text', '')
             all_segments = result.get('segments', [])
         
@@ -613,15 +630,18 @@ def cleanup_temp_files(file_paths: List[str]):
         except Exception as e:
             logger.warning(f"Failed to securely delete {file_path}: {e}")
 
-def transcribe_audio(file_path: str) -> str:
-    """Main transcription function """
+def transcribe_audio(file_path: str, validation: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Main transcription function.
+    validation (from validate_audio_file(file_path, keep_audio=True)) skips re-validating and re-decoding the file.
+    """
     try:
         # Check if file exists and is not empty
         if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
             return "[ERROR] File is missing or empty."
         
         # Use parallel processing for large files
-        result = transcribe_audio_parallel(file_path)
+        result = transcribe_audio_parallel(file_path, validation=validation)
         
         if not result['success']:
             return result['text']  # Return error message